@@ -13,24 +13,112 @@ Author: AWS AI Engineering Course
 Date: August 2025
 """
 
-import boto3
+import functools
+import gzip
+import hashlib
+import io
 import json
+import math
+import numpy as np
+import sys
+import time
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from botocore.exceptions import ClientError, NoCredentialsError
 import argparse
 
+# boto3/botocore are imported lazily: loading their service models costs
+# hundreds of ms, which --help and argparse errors should not pay
+
+# CloudWatch publishes with ~15min lag, so cached responses stay useful
+CACHE_TTL_SECONDS = 3600
+CACHE_DIR = Path.home() / '.cache' / 'ai_usage_monitor'
+
+@functools.lru_cache(maxsize=1)
+def _client_config():
+    """Shared client configuration: connection reuse across all fetches
+    plus adaptive retries so batched/concurrent calls survive throttling."""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=25,
+        tcp_keepalive=True,
+        connect_timeout=3,
+        read_timeout=20,
+        retries={'max_attempts': 10, 'mode': 'adaptive'}
+    )
+
+
+# Error codes that mean "slow down", not "broken"
+THROTTLE_ERROR_CODES = ('Throttling', 'ThrottlingException', 'RequestLimitExceeded')
+
+# Fixed-point scale for cost arithmetic: 1 dollar = 1e8 micro-cents.
+# Every Bedrock per-token price is a whole number at this granularity.
+MICRO_CENTS_PER_DOLLAR = 100_000_000
+
+
+@functools.lru_cache(maxsize=8)
+def _get_session(region: str):
+    """Return a shared boto3 Session per region.
+
+    Sharing one Session lets all clients reuse the same credential chain
+    and botocore loaders instead of re-resolving them per client.
+    """
+    import boto3
+    return boto3.session.Session(region_name=region)
+
+
+# AWS Bedrock pricing (as of August 2025 - prices may vary)
+BEDROCK_PRICING = {
+    'amazon.nova-lite-v1:0': {
+        'input_price_per_1k': 0.00006,   # $0.06 per 1K input tokens
+        'output_price_per_1k': 0.00024   # $0.24 per 1K output tokens
+    },
+    'anthropic.claude-3-5-sonnet-20241022-v2:0': {
+        'input_price_per_1k': 0.003,     # $3.00 per 1K input tokens
+        'output_price_per_1k': 0.015     # $15.00 per 1K output tokens
+    },
+    'anthropic.claude-3-5-haiku-20241022-v1:0': {
+        'input_price_per_1k': 0.00025,   # $0.25 per 1K input tokens
+        'output_price_per_1k': 0.00125   # $1.25 per 1K output tokens
+    },
+    'amazon.titan-text-express-v1': {
+        'input_price_per_1k': 0.0002,    # $0.20 per 1K input tokens
+        'output_price_per_1k': 0.0006    # $0.60 per 1K output tokens
+    }
+}
+
 
 class AiUsageMonitor:
     """Monitor AI token usage and billing across AWS services."""
-    
+
+    # Metric name -> key used in the per-model metrics dict
+    METRIC_KEYS = {
+        'Invocations': 'invocations',
+        'InputTokenCount': 'input_tokens',
+        'OutputTokenCount': 'output_tokens'
+    }
+
+    # Commonly used models to report on
+    KEY_MODELS = [
+        'amazon.nova-lite-v1:0',
+        'anthropic.claude-3-5-sonnet-20241022-v2:0',
+        'anthropic.claude-3-5-haiku-20241022-v1:0',
+        'amazon.titan-text-express-v1'
+    ]
+
     def __init__(self, region='us-east-1'):
         """Initialize the AI usage monitor."""
+        global ClientError, NoCredentialsError
+        from botocore.exceptions import ClientError, NoCredentialsError
+
         self.region = region
         try:
-            self.cloudwatch = boto3.client('cloudwatch', region_name=region)
-            self.cost_explorer = boto3.client('ce', region_name='us-east-1')  # CE is only in us-east-1
-            self.bedrock = boto3.client('bedrock', region_name=region)
+            session = _get_session(region)
+            config = _client_config()
+            self.cloudwatch = session.client('cloudwatch', config=config)
+            self.cost_explorer = session.client('ce', region_name='us-east-1',
+                                                config=config)  # CE is only in us-east-1
+            self.bedrock = session.client('bedrock', config=config)
             print(f"✅ Initialized AI Usage Monitor for region: {region}")
         except NoCredentialsError:
             print("❌ Error: AWS credentials not found. Please configure your credentials.")
@@ -38,102 +126,111 @@ class AiUsageMonitor:
         except Exception as e:
             print(f"❌ Error initializing monitor: {e}")
             raise
+
+        # Per-token prices in integer micro-cents (1e-8 dollars), derived
+        # once from the per-1K pricing table. Integer arithmetic keeps the
+        # billing math exact - no float rounding drift in the totals.
+        self._price_per_token_ucents = {
+            model_id: (round(prices['input_price_per_1k'] * MICRO_CENTS_PER_DOLLAR / 1000),
+                       round(prices['output_price_per_1k'] * MICRO_CENTS_PER_DOLLAR / 1000))
+            for model_id, prices in BEDROCK_PRICING.items()
+        }
+
+        # The priced model set is fixed at startup, so the kernel's price
+        # vectors can be specialized once here instead of per report call
+        self._kernel_index = {m: i for i, m in enumerate(self._price_per_token_ucents)}
+        self._in_price_vec = np.array(
+            [p[0] for p in self._price_per_token_ucents.values()], dtype=np.int64)
+        self._out_price_vec = np.array(
+            [p[1] for p in self._price_per_token_ucents.values()], dtype=np.int64)
     
-    def get_bedrock_usage_metrics(self, days_back: int = 7) -> Dict:
+    def get_bedrock_usage_metrics(self, days_back: int = 7,
+                                  end_time: Optional[datetime] = None) -> Dict:
         """
         Get Bedrock usage metrics from CloudWatch.
-        
+
         Args:
             days_back (int): Number of days to look back
-            
+            end_time (datetime): End of the analysis window (default: now)
+
         Returns:
             Dict: Usage metrics by model
         """
-        print(f"📊 Fetching Bedrock usage metrics for the last {days_back} days...")
-        
-        end_time = datetime.utcnow()
+        end_time = end_time or datetime.utcnow()
         start_time = end_time - timedelta(days=days_back)
-        
-        metrics = {}
-        
+
+        cache_key = self._cache_key('bedrock_metrics', start_time.date(), end_time.date())
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            print(f"📊 Using cached Bedrock usage metrics for the last {days_back} days")
+            return cached
+
+        print(f"📊 Fetching Bedrock usage metrics for the last {days_back} days...")
+
         try:
-            # Get available Bedrock models
-            models_response = self.bedrock.list_foundation_models()
-            available_models = [model['modelId'] for model in models_response['modelSummaries']]
-            
-            # Focus on commonly used models
-            key_models = [
-                'amazon.nova-lite-v1:0',
-                'anthropic.claude-3-5-sonnet-20241022-v2:0',
-                'anthropic.claude-3-5-haiku-20241022-v1:0',
-                'amazon.titan-text-express-v1'
-            ]
-            
-            for model_id in key_models:
-                if model_id in available_models:
-                    model_metrics = self._get_model_metrics(model_id, start_time, end_time)
-                    if model_metrics:
-                        metrics[model_id] = model_metrics
-            
+            # Batch all (model, metric) pairs into a single GetMetricData call
+            # instead of one GetMetricStatistics round-trip per pair. No
+            # list_foundation_models() pre-flight needed: CloudWatch simply
+            # returns empty datapoints for models with no traffic.
+            queries = []
+            query_map = {}  # query Id -> (model_id, metric key)
+            for model_index, model_id in enumerate(self.KEY_MODELS):
+                for metric_name, metric_key in self.METRIC_KEYS.items():
+                    query_id = f"m{model_index}_{metric_key}"
+                    query_map[query_id] = (model_id, metric_key)
+                    queries.append({
+                        'Id': query_id,
+                        'MetricStat': {
+                            'Metric': {
+                                'Namespace': 'AWS/Bedrock',
+                                'MetricName': metric_name,
+                                'Dimensions': [
+                                    {'Name': 'ModelId', 'Value': model_id}
+                                ]
+                            },
+                            'Period': 86400,  # 1 day
+                            'Stat': 'Sum'
+                        }
+                    })
+
+            if not queries:
+                return {}
+
+            metrics = {}
+            next_token = None
+            while True:
+                kwargs = {
+                    'MetricDataQueries': queries,
+                    'StartTime': start_time,
+                    'EndTime': end_time,
+                    'ScanBy': 'TimestampAscending'
+                }
+                if next_token:
+                    kwargs['NextToken'] = next_token
+
+                response = self.cloudwatch.get_metric_data(**kwargs)
+
+                for result in response.get('MetricDataResults', []):
+                    model_id, metric_key = query_map[result['Id']]
+                    model_metrics = metrics.setdefault(model_id, {
+                        'invocations': 0,
+                        'input_tokens': 0,
+                        'output_tokens': 0,
+                        'period': f"{start_time.date()} to {end_time.date()}"
+                    })
+                    model_metrics[metric_key] += sum(result.get('Values', []))
+
+                next_token = response.get('NextToken')
+                if not next_token:
+                    break
+
+            self._cache_put(cache_key, metrics)
             return metrics
-            
+
         except ClientError as e:
             print(f"⚠️  Error fetching CloudWatch metrics: {e}")
             return {}
     
-    def _get_model_metrics(self, model_id: str, start_time: datetime, end_time: datetime) -> Dict:
-        """Get metrics for a specific model."""
-        try:
-            # Get invocation count
-            invocations = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/Bedrock',
-                MetricName='Invocations',
-                Dimensions=[
-                    {'Name': 'ModelId', 'Value': model_id}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=86400,  # 1 day
-                Statistics=['Sum']
-            )
-            
-            # Get input tokens
-            input_tokens = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/Bedrock',
-                MetricName='InputTokenCount',
-                Dimensions=[
-                    {'Name': 'ModelId', 'Value': model_id}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=86400,
-                Statistics=['Sum']
-            )
-            
-            # Get output tokens
-            output_tokens = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/Bedrock',
-                MetricName='OutputTokenCount',
-                Dimensions=[
-                    {'Name': 'ModelId', 'Value': model_id}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=86400,
-                Statistics=['Sum']
-            )
-            
-            return {
-                'invocations': sum([point['Sum'] for point in invocations['Datapoints']]),
-                'input_tokens': sum([point['Sum'] for point in input_tokens['Datapoints']]),
-                'output_tokens': sum([point['Sum'] for point in output_tokens['Datapoints']]),
-                'period': f"{start_time.date()} to {end_time.date()}"
-            }
-            
-        except ClientError as e:
-            print(f"⚠️  Could not get metrics for {model_id}: {e}")
-            return {}
-    
     def calculate_bedrock_costs(self, usage_metrics: Dict) -> Dict:
         """
         Calculate estimated costs based on Bedrock pricing.
@@ -145,232 +242,322 @@ class AiUsageMonitor:
             Dict: Cost estimates by model
         """
         print("💰 Calculating estimated costs...")
-        
-        # AWS Bedrock pricing (as of August 2025 - prices may vary)
-        pricing = {
-            'amazon.nova-lite-v1:0': {
-                'input_price_per_1k': 0.00006,   # $0.06 per 1K input tokens
-                'output_price_per_1k': 0.00024   # $0.24 per 1K output tokens
-            },
-            'anthropic.claude-3-5-sonnet-20241022-v2:0': {
-                'input_price_per_1k': 0.003,     # $3.00 per 1K input tokens
-                'output_price_per_1k': 0.015     # $15.00 per 1K output tokens
-            },
-            'anthropic.claude-3-5-haiku-20241022-v1:0': {
-                'input_price_per_1k': 0.00025,   # $0.25 per 1K input tokens
-                'output_price_per_1k': 0.00125   # $1.25 per 1K output tokens
-            },
-            'amazon.titan-text-express-v1': {
-                'input_price_per_1k': 0.0002,    # $0.20 per 1K input tokens
-                'output_price_per_1k': 0.0006    # $0.60 per 1K output tokens
-            }
-        }
-        
+
+        # Models with both usage data and a pricing entry, in stable order
+        priced_models = [m for m, metrics in usage_metrics.items()
+                         if m in BEDROCK_PRICING and metrics]
+
+        if not priced_models:
+            return {'total_estimated_cost': 0}
+
+        # Structure-of-arrays layout: one vectorized multiply per cost
+        # component instead of scalar math per model. All cost arithmetic
+        # is exact int64 micro-cents; floats appear only in the output.
+        input_tokens = np.array([usage_metrics[m]['input_tokens'] for m in priced_models],
+                                dtype=np.int64)
+        output_tokens = np.array([usage_metrics[m]['output_tokens'] for m in priced_models],
+                                 dtype=np.int64)
+        invocations = np.array([usage_metrics[m]['invocations'] for m in priced_models],
+                               dtype=np.int64)
+
+        kernel_rows = [self._kernel_index[m] for m in priced_models]
+        in_price = self._in_price_vec[kernel_rows]
+        out_price = self._out_price_vec[kernel_rows]
+
+        input_costs = input_tokens * in_price
+        output_costs = output_tokens * out_price
+        model_totals = input_costs + output_costs
+
         cost_breakdown = {}
-        total_cost = 0
-        
-        for model_id, metrics in usage_metrics.items():
-            if model_id in pricing and metrics:
-                model_pricing = pricing[model_id]
-                
-                input_cost = (metrics['input_tokens'] / 1000) * model_pricing['input_price_per_1k']
-                output_cost = (metrics['output_tokens'] / 1000) * model_pricing['output_price_per_1k']
-                model_total = input_cost + output_cost
-                
-                cost_breakdown[model_id] = {
-                    'input_cost': input_cost,
-                    'output_cost': output_cost,
-                    'total_cost': model_total,
-                    'invocations': metrics['invocations'],
-                    'input_tokens': metrics['input_tokens'],
-                    'output_tokens': metrics['output_tokens'],
-                    'avg_cost_per_invocation': model_total / max(metrics['invocations'], 1)
-                }
-                
-                total_cost += model_total
-        
-        cost_breakdown['total_estimated_cost'] = total_cost
+        for i, model_id in enumerate(priced_models):
+            model_total_ucents = int(model_totals[i])
+            cost_breakdown[model_id] = {
+                'input_cost': int(input_costs[i]) / MICRO_CENTS_PER_DOLLAR,
+                'output_cost': int(output_costs[i]) / MICRO_CENTS_PER_DOLLAR,
+                'total_cost': model_total_ucents / MICRO_CENTS_PER_DOLLAR,
+                'invocations': int(invocations[i]),
+                'input_tokens': int(input_tokens[i]),
+                'output_tokens': int(output_tokens[i]),
+                'avg_cost_per_invocation': (model_total_ucents /
+                                            max(int(invocations[i]), 1) /
+                                            MICRO_CENTS_PER_DOLLAR)
+            }
+
+        cost_breakdown['total_estimated_cost'] = int(model_totals.sum()) / MICRO_CENTS_PER_DOLLAR
         return cost_breakdown
     
-    def get_aws_billing_data(self, days_back: int = 30) -> Dict:
+    def get_aws_billing_data(self, days_back: int = 30,
+                             end_time: Optional[datetime] = None) -> Dict:
         """
         Get actual AWS billing data from Cost Explorer.
-        
+
         Args:
             days_back (int): Number of days to look back
-            
+            end_time (datetime): End of the analysis window (default: now)
+
         Returns:
             Dict: Billing data
         """
-        print(f"💳 Fetching AWS billing data for the last {days_back} days...")
-        
-        end_date = datetime.utcnow().date()
+        end_date = (end_time or datetime.utcnow()).date()
         start_date = end_date - timedelta(days=days_back)
-        
+
+        cache_key = self._cache_key('billing_data', start_date, end_date)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            print(f"💳 Using cached AWS billing data for the last {days_back} days")
+            return cached
+
+        print(f"💳 Fetching AWS billing data for the last {days_back} days...")
+
+        time_period = {
+            'Start': start_date.strftime('%Y-%m-%d'),
+            'End': end_date.strftime('%Y-%m-%d')
+        }
+
         try:
-            # Get overall costs
-            cost_response = self.cost_explorer.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
+            # Overall daily totals (no GroupBy - small response)
+            total_cost = 0
+            for result in self._paginate_cost_and_usage(
+                TimePeriod=time_period,
+                Granularity='DAILY',
+                Metrics=['BlendedCost']
+            ):
+                total_cost += float(result['Total']['BlendedCost']['Amount'])
+
+            # Bedrock-specific costs, filtered server-side instead of
+            # scanning every service group client-side
+            bedrock_costs = []
+            for result in self._paginate_cost_and_usage(
+                TimePeriod=time_period,
                 Granularity='DAILY',
                 Metrics=['BlendedCost'],
                 GroupBy=[
                     {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-                ]
-            )
-            
-            # Get Bedrock-specific costs
-            bedrock_costs = []
-            total_cost = 0
-            
-            for result in cost_response['ResultsByTime']:
+                ],
+                Filter={
+                    'Dimensions': {
+                        'Key': 'SERVICE',
+                        'Values': ['Amazon Bedrock']
+                    }
+                }
+            ):
                 date = result['TimePeriod']['Start']
                 for group in result['Groups']:
                     service = group['Keys'][0]
                     cost = float(group['Metrics']['BlendedCost']['Amount'])
-                    
-                    if 'Bedrock' in service or 'bedrock' in service.lower():
-                        bedrock_costs.append({
-                            'date': date,
-                            'service': service,
-                            'cost': cost
-                        })
-                    
-                    total_cost += cost
-            
-            return {
+                    bedrock_costs.append({
+                        'date': date,
+                        'service': service,
+                        'cost': cost
+                    })
+
+            billing_data = {
                 'period': f"{start_date} to {end_date}",
                 'bedrock_costs': bedrock_costs,
-                'total_bedrock_cost': sum([item['cost'] for item in bedrock_costs]),
+                'total_bedrock_cost': math.fsum(item['cost'] for item in bedrock_costs),
                 'total_aws_cost': total_cost
             }
+            self._cache_put(cache_key, billing_data)
+            return billing_data
             
         except ClientError as e:
-            print(f"⚠️  Error accessing Cost Explorer: {e}")
-            print("   Note: Cost Explorer requires specific IAM permissions")
+            error_code = e.response.get('Error', {}).get('Code', '')
+            if error_code in THROTTLE_ERROR_CODES:
+                print(f"⚠️  Cost Explorer throttled the request ({error_code}) - "
+                      "retries exhausted, try again shortly")
+            else:
+                print(f"⚠️  Error accessing Cost Explorer: {e}")
+                print("   Note: Cost Explorer requires specific IAM permissions")
             return {}
-    
-    def generate_usage_report(self, days_back: int = 7) -> None:
-        """Generate a comprehensive usage and billing report."""
-        print("=" * 60)
-        print("🤖 AWS AI TOKEN USAGE & BILLING REPORT")
-        print("=" * 60)
-        
+
+    def _cache_key(self, *parts) -> str:
+        """Build a stable cache key from query parameters."""
+        raw = '|'.join(str(part) for part in (self.region,) + parts)
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Return cached data for key if present and fresh, else None."""
+        cache_file = CACHE_DIR / f"{key}.json.gz"
+        try:
+            if cache_file.exists() and time.time() - cache_file.stat().st_mtime < CACHE_TTL_SECONDS:
+                with gzip.open(cache_file, 'rt', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception:
+            pass  # Corrupt or unreadable cache entry - just refetch
+        return None
+
+    def _cache_put(self, key: str, data: Dict) -> None:
+        """Store data in the on-disk cache."""
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with gzip.open(CACHE_DIR / f"{key}.json.gz", 'wt', encoding='utf-8') as f:
+                json.dump(data, f)
+        except Exception as e:
+            print(f"⚠️  Could not write cache: {e}")
+
+    def _paginate_cost_and_usage(self, **kwargs) -> List[Dict]:
+        """Collect all ResultsByTime pages from get_cost_and_usage.
+
+        Cost Explorer has no boto3 paginator, so follow NextPageToken
+        manually to avoid silently truncated results.
+        """
+        results = []
+        while True:
+            response = self.cost_explorer.get_cost_and_usage(**kwargs)
+            results.extend(response.get('ResultsByTime', []))
+            token = response.get('NextPageToken')
+            if not token:
+                return results
+            kwargs['NextPageToken'] = token
+
+    def generate_usage_report(self, days_back: int = 7, output_format: str = 'text') -> None:
+        """Generate a comprehensive usage and billing report.
+
+        Args:
+            days_back (int): Number of days to analyze
+            output_format (str): 'text' for the formatted report or 'json'
+                for machine-readable output
+        """
+        # One timestamp for the whole report so both fetch phases share a
+        # consistent analysis window
+        report_end_time = datetime.utcnow()
+
         # Get usage metrics
-        usage_metrics = self.get_bedrock_usage_metrics(days_back)
-        
+        usage_metrics = self.get_bedrock_usage_metrics(days_back, end_time=report_end_time)
+
         if not usage_metrics:
             print("❌ No usage metrics found. This could mean:")
             print("   - No Bedrock usage in the specified period")
             print("   - CloudWatch metrics not yet available (can take up to 15 minutes)")
             print("   - Insufficient permissions to access CloudWatch")
             return
-        
+
         # Calculate costs
         cost_breakdown = self.calculate_bedrock_costs(usage_metrics)
-        
-        # Display results
-        print(f"\n📊 USAGE SUMMARY (Last {days_back} days)")
-        print("-" * 50)
-        
+
+        # Get actual billing data
+        billing_data = self.get_aws_billing_data(30, end_time=report_end_time)
+
+        if output_format == 'json':
+            json.dump({'cost_breakdown': cost_breakdown, 'billing': billing_data},
+                      sys.stdout, indent=2, default=str)
+            sys.stdout.write('\n')
+            return
+
+        # Build the whole text report in one buffer, one stdout write at
+        # the end instead of dozens of print calls
+        buf = io.StringIO()
+        w = buf.write
+
+        w("=" * 60 + "\n")
+        w("🤖 AWS AI TOKEN USAGE & BILLING REPORT\n")
+        w("=" * 60 + "\n")
+
+        w(f"\n📊 USAGE SUMMARY (Last {days_back} days)\n")
+        w("-" * 50 + "\n")
+
         total_invocations = 0
         total_input_tokens = 0
         total_output_tokens = 0
-        
+
         for model_id, data in cost_breakdown.items():
             if model_id != 'total_estimated_cost':
-                print(f"\n🔹 {model_id}")
-                print(f"   Invocations: {int(data['invocations']):,}")
-                print(f"   Input Tokens: {int(data['input_tokens']):,}")
-                print(f"   Output Tokens: {int(data['output_tokens']):,}")
-                print(f"   Total Tokens: {int(data['input_tokens'] + data['output_tokens']):,}")
-                
+                w(f"\n🔹 {model_id}\n")
+                w(f"   Invocations: {int(data['invocations']):,}\n")
+                w(f"   Input Tokens: {int(data['input_tokens']):,}\n")
+                w(f"   Output Tokens: {int(data['output_tokens']):,}\n")
+                w(f"   Total Tokens: {int(data['input_tokens'] + data['output_tokens']):,}\n")
+
                 total_invocations += data['invocations']
                 total_input_tokens += data['input_tokens']
                 total_output_tokens += data['output_tokens']
-        
-        print(f"\n📈 TOTAL USAGE")
-        print("-" * 30)
-        print(f"Total Invocations: {int(total_invocations):,}")
-        print(f"Total Input Tokens: {int(total_input_tokens):,}")
-        print(f"Total Output Tokens: {int(total_output_tokens):,}")
-        print(f"Total Tokens: {int(total_input_tokens + total_output_tokens):,}")
-        
-        print(f"\n💰 ESTIMATED COSTS")
-        print("-" * 30)
-        
+
+        w(f"\n📈 TOTAL USAGE\n")
+        w("-" * 30 + "\n")
+        w(f"Total Invocations: {int(total_invocations):,}\n")
+        w(f"Total Input Tokens: {int(total_input_tokens):,}\n")
+        w(f"Total Output Tokens: {int(total_output_tokens):,}\n")
+        w(f"Total Tokens: {int(total_input_tokens + total_output_tokens):,}\n")
+
+        w(f"\n💰 ESTIMATED COSTS\n")
+        w("-" * 30 + "\n")
+
         for model_id, data in cost_breakdown.items():
             if model_id != 'total_estimated_cost':
-                print(f"\n🔹 {model_id}")
-                print(f"   Input Cost: ${data['input_cost']:.4f}")
-                print(f"   Output Cost: ${data['output_cost']:.4f}")
-                print(f"   Total Cost: ${data['total_cost']:.4f}")
-                print(f"   Avg Cost/Invocation: ${data['avg_cost_per_invocation']:.4f}")
-        
-        print(f"\n💵 TOTAL ESTIMATED COST: ${cost_breakdown['total_estimated_cost']:.4f}")
-        
-        # Get actual billing data
-        print(f"\n💳 ACTUAL BILLING DATA (Last 30 days)")
-        print("-" * 40)
-        
-        billing_data = self.get_aws_billing_data(30)
+                w(f"\n🔹 {model_id}\n")
+                w(f"   Input Cost: ${data['input_cost']:.4f}\n")
+                w(f"   Output Cost: ${data['output_cost']:.4f}\n")
+                w(f"   Total Cost: ${data['total_cost']:.4f}\n")
+                w(f"   Avg Cost/Invocation: ${data['avg_cost_per_invocation']:.4f}\n")
+
+        w(f"\n💵 TOTAL ESTIMATED COST: ${cost_breakdown['total_estimated_cost']:.4f}\n")
+
+        w(f"\n💳 ACTUAL BILLING DATA (Last 30 days)\n")
+        w("-" * 40 + "\n")
+
         if billing_data:
-            print(f"Total Bedrock Cost: ${billing_data['total_bedrock_cost']:.4f}")
-            print(f"Total AWS Cost: ${billing_data['total_aws_cost']:.2f}")
-            
+            w(f"Total Bedrock Cost: ${billing_data['total_bedrock_cost']:.4f}\n")
+            w(f"Total AWS Cost: ${billing_data['total_aws_cost']:.2f}\n")
+
             if billing_data['bedrock_costs']:
-                print(f"\nBedrock Daily Costs:")
+                w(f"\nBedrock Daily Costs:\n")
                 for cost_item in billing_data['bedrock_costs'][-7:]:  # Last 7 days
-                    print(f"   {cost_item['date']}: ${cost_item['cost']:.4f}")
+                    w(f"   {cost_item['date']}: ${cost_item['cost']:.4f}\n")
         else:
-            print("Could not retrieve billing data - check Cost Explorer permissions")
-        
+            w("Could not retrieve billing data - check Cost Explorer permissions\n")
+
         # Recommendations
-        self._generate_recommendations(cost_breakdown, total_invocations)
-    
-    def _generate_recommendations(self, cost_breakdown: Dict, total_invocations: int) -> None:
-        """Generate cost optimization recommendations."""
-        print(f"\n💡 RECOMMENDATIONS")
-        print("-" * 30)
-        
+        self._generate_recommendations(cost_breakdown, total_invocations, w)
+
+        sys.stdout.write(buf.getvalue())
+
+    def _generate_recommendations(self, cost_breakdown: Dict, total_invocations: int, w) -> None:
+        """Write cost optimization recommendations to the report buffer."""
+        w(f"\n💡 RECOMMENDATIONS\n")
+        w("-" * 30 + "\n")
+
         if total_invocations == 0:
-            print("• No usage detected in the specified period")
+            w("• No usage detected in the specified period\n")
             return
-        
-        # Model efficiency recommendations
-        most_used_model = max(
-            [(k, v) for k, v in cost_breakdown.items() if k != 'total_estimated_cost'],
-            key=lambda x: x[1]['invocations'],
-            default=(None, None)
-        )
-        
-        if most_used_model[0]:
-            print(f"• Most used model: {most_used_model[0]}")
-            print(f"  Average cost per invocation: ${most_used_model[1]['avg_cost_per_invocation']:.4f}")
-        
+
+        # Model efficiency recommendations - single pass over the breakdown
+        # picks the most used model and accumulates token totals together
+        best_model = None
+        best_data = None
+        best_invocations = -1
+        total_tokens = 0
+
+        for model_id, data in cost_breakdown.items():
+            if model_id == 'total_estimated_cost':
+                continue
+            total_tokens += data['input_tokens'] + data['output_tokens']
+            if data['invocations'] > best_invocations:
+                best_model, best_data, best_invocations = model_id, data, data['invocations']
+
+        if best_model:
+            w(f"• Most used model: {best_model}\n")
+            w(f"  Average cost per invocation: ${best_data['avg_cost_per_invocation']:.4f}\n")
+
         # Cost optimization suggestions
         total_cost = cost_breakdown['total_estimated_cost']
-        
+
         if total_cost > 10:
-            print("• Consider using Amazon Nova Lite for cost-effective AI tasks")
-            print("• Review prompts to optimize token usage")
-            print("• Implement caching for repeated queries")
+            w("• Consider using Amazon Nova Lite for cost-effective AI tasks\n")
+            w("• Review prompts to optimize token usage\n")
+            w("• Implement caching for repeated queries\n")
         elif total_cost > 1:
-            print("• Monitor usage regularly to avoid unexpected costs")
-            print("• Consider setting up billing alerts")
+            w("• Monitor usage regularly to avoid unexpected costs\n")
+            w("• Consider setting up billing alerts\n")
         else:
-            print("• Your AI usage costs are well controlled")
-            print("• Continue monitoring as usage scales")
-        
-        # Token efficiency tips
-        avg_tokens_per_invocation = (cost_breakdown.get('total_input_tokens', 0) + 
-                                    cost_breakdown.get('total_output_tokens', 0)) / max(total_invocations, 1)
-        
+            w("• Your AI usage costs are well controlled\n")
+            w("• Continue monitoring as usage scales\n")
+
+        # Token efficiency tips, from the totals gathered in the pass above
+        avg_tokens_per_invocation = total_tokens / max(total_invocations, 1)
+
         if avg_tokens_per_invocation > 1000:
-            print("• Consider shorter, more focused prompts to reduce token usage")
-            print("• Break down complex tasks into smaller requests")
+            w("• Consider shorter, more focused prompts to reduce token usage\n")
+            w("• Break down complex tasks into smaller requests\n")
 
 
 def main():
@@ -382,16 +569,22 @@ def main():
                        help='AWS region (default: us-east-1)')
     parser.add_argument('--detailed', action='store_true',
                        help='Show detailed breakdown by model')
-    
+    parser.add_argument('--format', '-f', type=str, default='text',
+                       choices=['text', 'json'],
+                       help='Output format (default: text)')
+
     args = parser.parse_args()
-    
+
     try:
         # Initialize monitor
         monitor = AiUsageMonitor(region=args.region)
-        
+
         # Generate report
-        monitor.generate_usage_report(days_back=args.days)
-        
+        monitor.generate_usage_report(days_back=args.days, output_format=args.format)
+
+        if args.format == 'json':
+            return
+
         print(f"\n" + "=" * 60)
         print("📋 Note: Estimates based on current AWS Bedrock pricing")
         print("💡 For real-time billing, check AWS Cost Explorer console")
@@ -9,56 +9,164 @@ Author: AWS AI Engineering Course
 Date: August 2025
 """
 
-import boto3
+import asyncio
+import botocore.exceptions
+import functools
+import heapq
+import io
+import itertools
 import json
 import argparse
+import calendar
+import operator
+import sys
+import threading
+
+# Optional: single-event-loop fan-out without thread overhead
+try:
+    import aioboto3
+except ImportError:
+    aioboto3 = None
+
+# Optional: C-level JSON serialization for report export
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from decimal import Decimal
 
 
+# Line templates for the per-row report loops, compiled once at import so
+# the padding/precision specs aren't re-parsed on every iteration
+_SERVICE_LINE = "  {i}. {service:<40} ${cost:>8.2f} ({pct:>5.1f}%)\n"
+_USAGE_LINE = "     • {usage_type}: ${cost:.4f}\n"
+
+
+def _daily_memo(method):
+    """Cache a fetcher's result per (args, day) for this monitor instance.
+
+    Cost Explorer bills $0.01 per request, so repeated report/export runs
+    in one process should not re-issue identical queries.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())),
+               datetime.now().strftime('%Y-%m-%d'))
+        with self._cache_lock:
+            if key in self._api_cache:
+                return self._api_cache[key]
+        result = method(self, *args, **kwargs)
+        with self._cache_lock:
+            self._api_cache[key] = result
+        return result
+    return wrapper
+
+
 class AWSBillingMonitor:
     """Comprehensive AWS billing and usage monitor across all services."""
     
     def __init__(self, region_name: str = 'us-east-1'):
         """Initialize the billing monitor."""
         self.region = region_name
-        
-        # Initialize AWS clients
+
+        # boto3 loads its full client registry on import, so it is
+        # deferred to construction time rather than module import
+        import boto3.session
+        import botocore.config
+
+        # One session and one config shared by every client: the thread
+        # and asyncio fan-outs above need more than the default
+        # 10-connection pool, and adaptive retries back off cleanly on
+        # Cost Explorer's strict per-second rate limits
         try:
-            self.cost_explorer = boto3.client('ce', region_name='us-east-1')  # CE is only in us-east-1
-            self.cloudwatch = boto3.client('cloudwatch', region_name=region_name)
-            self.ec2 = boto3.client('ec2', region_name=region_name)
-            self.s3 = boto3.client('s3', region_name=region_name)
-            self.bedrock = boto3.client('bedrock', region_name=region_name)
-            self.pricing = boto3.client('pricing', region_name='us-east-1')  # Pricing API only in us-east-1
-            
-            print(f"✅ Initialized AWS clients for region: {region_name}")
+            self._session = boto3.session.Session(region_name=region_name)
+            self._config = botocore.config.Config(
+                max_pool_connections=50,
+                retries={'mode': 'adaptive', 'max_attempts': 5},
+                tcp_keepalive=True
+            )
+            print(f"✅ Initialized AWS session for region: {region_name}")
         except Exception as e:
-            print(f"❌ Error initializing AWS clients: {e}")
+            print(f"❌ Error initializing AWS session: {e}")
             raise
+
+        # Per-instance memo for the daily fetcher results
+        self._api_cache = {}
+        self._cache_lock = threading.Lock()
+
+    # Clients are built on first use: a --quiet run only ever touches
+    # Cost Explorer, so the other five TLS-capable clients are never paid for
+
+    @functools.cached_property
+    def cost_explorer(self):
+        # CE is only in us-east-1
+        return self._session.client('ce', region_name='us-east-1', config=self._config)
+
+    @functools.cached_property
+    def cloudwatch(self):
+        return self._session.client('cloudwatch', config=self._config)
+
+    @functools.cached_property
+    def ec2(self):
+        return self._session.client('ec2', config=self._config)
+
+    @functools.cached_property
+    def s3(self):
+        return self._session.client('s3', config=self._config)
+
+    @functools.cached_property
+    def bedrock(self):
+        return self._session.client('bedrock', config=self._config)
+
+    @functools.cached_property
+    def pricing(self):
+        # Pricing API only in us-east-1
+        return self._session.client('pricing', region_name='us-east-1', config=self._config)
+
+    def _window(self, days: int):
+        """Compute the analysis window from a single clock read.
+
+        Returns (start_str, end_str, now). Reading the clock once keeps
+        the start and end dates consistent even across midnight.
+        """
+        now = datetime.now()
+        return ((now - timedelta(days=days)).strftime('%Y-%m-%d'),
+                now.strftime('%Y-%m-%d'),
+                now)
     
-    def get_overall_costs(self, days: int = 30) -> Dict[str, Any]:
+    @_daily_memo
+    def get_overall_costs(self, days: int = 30, granularity: Optional[str] = None) -> Dict[str, Any]:
         """
         Get overall AWS costs for the specified period.
-        
+
         Args:
             days (int): Number of days to analyze
-            
+            granularity (str): 'DAILY' or 'MONTHLY'; defaults to MONTHLY
+                for windows of 28 days or more since only period totals
+                are displayed
+
         Returns:
             Dict containing cost breakdown by service
         """
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-        
+        start_date, end_date, _ = self._window(days)
+
+        if granularity is None:
+            granularity = 'MONTHLY' if days >= 28 else 'DAILY'
+
         try:
+            # Only BlendedCost is consumed downstream; requesting extra
+            # metrics just inflates the response payload
             response = self.cost_explorer.get_cost_and_usage(
                 TimePeriod={
                     'Start': start_date,
                     'End': end_date
                 },
-                Granularity='DAILY',
-                Metrics=['BlendedCost', 'UnblendedCost', 'UsageQuantity'],
+                Granularity=granularity,
+                Metrics=['BlendedCost'],
                 GroupBy=[
                     {
                         'Type': 'DIMENSION',
@@ -73,6 +181,7 @@ class AWSBillingMonitor:
             print(f"❌ Error getting cost data: {e}")
             return {}
     
+    @_daily_memo
     def get_service_specific_costs(self, days: int = 30) -> Dict[str, Any]:
         """Get detailed costs for specific AWS services."""
         services_of_interest = [
@@ -88,73 +197,127 @@ class AWSBillingMonitor:
             'Amazon Route 53'
         ]
         
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-        
+        start_date, end_date, _ = self._window(days)
+
+        # The per-service queries are independent network round-trips, so
+        # fan them out instead of paying ~10 serial Cost Explorer latencies.
+        # With aioboto3 installed the whole fan-out runs on one event loop;
+        # otherwise a thread pool gives the same wall-clock shape.
+        if aioboto3 is not None:
+            return asyncio.run(
+                self._afetch_service_costs(services_of_interest, start_date, end_date))
+
         service_costs = {}
-        
-        for service in services_of_interest:
-            try:
-                response = self.cost_explorer.get_cost_and_usage(
-                    TimePeriod={
-                        'Start': start_date,
-                        'End': end_date
-                    },
-                    Granularity='MONTHLY',
-                    Metrics=['BlendedCost'],
-                    GroupBy=[
-                        {
-                            'Type': 'DIMENSION',
-                            'Key': 'USAGE_TYPE'
-                        }
-                    ],
-                    Filter={
-                        'Dimensions': {
-                            'Key': 'SERVICE',
-                            'Values': [service]
-                        }
-                    }
-                )
-                
-                service_costs[service] = self._process_service_cost_response(response)
-                
-            except Exception as e:
-                print(f"⚠️  Could not get costs for {service}: {e}")
-                service_costs[service] = {'total_cost': 0.0, 'usage_details': []}
-        
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            futures = {
+                executor.submit(self._fetch_service_cost, service, start_date, end_date): service
+                for service in services_of_interest
+            }
+            for future in as_completed(futures):
+                service = futures[future]
+                try:
+                    service_costs[service] = future.result()
+                except Exception as e:
+                    print(f"⚠️  Could not get costs for {service}: {e}")
+                    service_costs[service] = {'total_cost': 0.0, 'usage_details': []}
+
         return service_costs
+
+    @staticmethod
+    def _service_cost_kwargs(service: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Build the get_cost_and_usage kwargs for one service breakdown."""
+        return {
+            'TimePeriod': {
+                'Start': start_date,
+                'End': end_date
+            },
+            'Granularity': 'MONTHLY',
+            'Metrics': ['BlendedCost'],
+            'GroupBy': [
+                {
+                    'Type': 'DIMENSION',
+                    'Key': 'USAGE_TYPE'
+                }
+            ],
+            'Filter': {
+                'Dimensions': {
+                    'Key': 'SERVICE',
+                    'Values': [service]
+                }
+            }
+        }
+
+    def _fetch_service_cost(self, service: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Fetch and process the cost breakdown for one service."""
+        response = self.cost_explorer.get_cost_and_usage(
+            **self._service_cost_kwargs(service, start_date, end_date))
+        return self._process_service_cost_response(response)
+
+    async def _afetch_service_costs(self, services: List[str], start_date: str,
+                                    end_date: str) -> Dict[str, Any]:
+        """Fan out all per-service cost queries on one asyncio event loop."""
+        session = aioboto3.Session()
+        async with session.client('ce', region_name='us-east-1') as ce:
+            async def fetch_one(service):
+                try:
+                    response = await ce.get_cost_and_usage(
+                        **self._service_cost_kwargs(service, start_date, end_date))
+                    return service, self._process_service_cost_response(response)
+                except Exception as e:
+                    print(f"⚠️  Could not get costs for {service}: {e}")
+                    return service, {'total_cost': 0.0, 'usage_details': []}
+
+            results = await asyncio.gather(*(fetch_one(s) for s in services))
+
+        return dict(results)
     
-    def get_ec2_usage_details(self) -> Dict[str, Any]:
-        """Get detailed EC2 usage and costs."""
+    @_daily_memo
+    def get_ec2_usage_details(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Get detailed EC2 usage and costs.
+
+        Args:
+            limit: Cap on how many instance records to materialize.
+                State counts still cover every instance; only the
+                detail list stops growing.
+        """
         try:
-            # Get EC2 instances
-            instances_response = self.ec2.describe_instances()
-            
             instances = []
-            for reservation in instances_response['Reservations']:
-                for instance in reservation['Instances']:
-                    instance_info = {
-                        'instance_id': instance['InstanceId'],
-                        'instance_type': instance['InstanceType'],
-                        'state': instance['State']['Name'],
-                        'launch_time': instance.get('LaunchTime', 'Unknown'),
-                        'vpc_id': instance.get('VpcId', 'N/A'),
-                        'subnet_id': instance.get('SubnetId', 'N/A'),
-                        'public_ip': instance.get('PublicIpAddress', 'N/A'),
-                        'private_ip': instance.get('PrivateIpAddress', 'N/A')
-                    }
-                    
-                    # Get tags
-                    tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
-                    instance_info['tags'] = tags
-                    instance_info['name'] = tags.get('Name', 'Unnamed')
-                    
-                    instances.append(instance_info)
-            
+            state_counts = Counter()
+
+            # Paginate so accounts with many instances aren't truncated,
+            # counting states in the same pass that builds the list
+            for page in self.ec2.get_paginator('describe_instances').paginate():
+                for reservation in page['Reservations']:
+                    for instance in reservation['Instances']:
+                        state = instance['State']['Name']
+                        state_counts[state] += 1
+
+                        if limit is not None and len(instances) >= limit:
+                            continue
+
+                        # Only the Name tag is consumed; scanning for it
+                        # directly avoids building a throwaway dict per
+                        # instance on accounts with heavy tagging
+                        name = next((tag['Value']
+                                     for tag in instance.get('Tags', ())
+                                     if tag['Key'] == 'Name'), 'Unnamed')
+
+                        instances.append({
+                            'instance_id': instance['InstanceId'],
+                            'instance_type': instance['InstanceType'],
+                            'state': state,
+                            'name': name,
+                            'launch_time': instance.get('LaunchTime', 'Unknown'),
+                            'vpc_id': instance.get('VpcId', 'N/A'),
+                            'subnet_id': instance.get('SubnetId', 'N/A'),
+                            'public_ip': instance.get('PublicIpAddress', 'N/A'),
+                            'private_ip': instance.get('PrivateIpAddress', 'N/A')
+                        })
+
             return {
-                'total_instances': len(instances),
-                'running_instances': len([i for i in instances if i['state'] == 'running']),
-                'stopped_instances': len([i for i in instances if i['state'] == 'stopped']),
+                'total_instances': sum(state_counts.values()),
+                'running_instances': state_counts['running'],
+                'stopped_instances': state_counts['stopped'],
                 'instances': instances
             }
             
@@ -162,54 +325,34 @@ class AWSBillingMonitor:
             print(f"❌ Error getting EC2 details: {e}")
             return {'total_instances': 0, 'instances': []}
     
-    def get_s3_usage_details(self) -> Dict[str, Any]:
-        """Get detailed S3 usage and costs."""
+    @_daily_memo
+    def get_s3_usage_details(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Get detailed S3 usage and costs.
+
+        Args:
+            limit: Describe only the first N buckets. Skips their two
+                metadata round-trips for the rest, at the cost of
+                object/size totals covering just the described subset.
+        """
         try:
             # Get S3 buckets
             buckets_response = self.s3.list_buckets()
-            
-            buckets = []
-            total_objects = 0
-            total_size_bytes = 0
-            
-            for bucket in buckets_response['Buckets']:
-                bucket_name = bucket['Name']
-                bucket_info = {
-                    'name': bucket_name,
-                    'creation_date': bucket['CreationDate'],
-                    'region': 'Unknown'
-                }
-                
-                try:
-                    # Get bucket region
-                    location = self.s3.get_bucket_location(Bucket=bucket_name)
-                    bucket_info['region'] = location.get('LocationConstraint', 'us-east-1')
-                    
-                    # Get bucket size (this is an approximation)
-                    try:
-                        objects = self.s3.list_objects_v2(Bucket=bucket_name, MaxKeys=1000)
-                        bucket_objects = objects.get('KeyCount', 0)
-                        bucket_size = sum(obj.get('Size', 0) for obj in objects.get('Contents', []))
-                        
-                        bucket_info['object_count'] = bucket_objects
-                        bucket_info['size_bytes'] = bucket_size
-                        bucket_info['size_gb'] = round(bucket_size / (1024**3), 3)
-                        
-                        total_objects += bucket_objects
-                        total_size_bytes += bucket_size
-                        
-                    except Exception:
-                        bucket_info['object_count'] = 'Access Denied'
-                        bucket_info['size_bytes'] = 0
-                        bucket_info['size_gb'] = 0
-                
-                except Exception as e:
-                    bucket_info['region'] = f'Error: {e}'
-                
-                buckets.append(bucket_info)
-            
+            bucket_list = buckets_response['Buckets']
+            total_buckets = len(bucket_list)
+            if limit is not None:
+                bucket_list = bucket_list[:limit]
+
+            # Each bucket needs two metadata round-trips; fan them out so
+            # 50 buckets cost ~2 latencies instead of ~100
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                buckets = list(executor.map(self._describe_bucket, bucket_list))
+
+            total_objects = sum(b['object_count'] for b in buckets
+                                if isinstance(b['object_count'], int))
+            total_size_bytes = sum(b['size_bytes'] for b in buckets)
+
             return {
-                'total_buckets': len(buckets),
+                'total_buckets': total_buckets,
                 'total_objects': total_objects,
                 'total_size_gb': round(total_size_bytes / (1024**3), 3),
                 'buckets': buckets
@@ -218,47 +361,164 @@ class AWSBillingMonitor:
         except Exception as e:
             print(f"❌ Error getting S3 details: {e}")
             return {'total_buckets': 0, 'buckets': []}
+
+    @staticmethod
+    def _call_or_code(api_call, **kwargs):
+        """Call an AWS API, returning (response, None) or (None, error_code).
+
+        Cross-account setups deny access for most buckets, so denied
+        calls are the common case there; returning a code keeps the
+        caller on a plain branch instead of raising per bucket.
+        """
+        try:
+            return api_call(**kwargs), None
+        except botocore.exceptions.ClientError as e:
+            return None, e.response.get('Error', {}).get('Code', 'ClientError')
+
+    def _describe_bucket(self, bucket: Dict) -> Dict[str, Any]:
+        """Fetch region and size metadata for one bucket."""
+        bucket_name = bucket['Name']
+        bucket_info = {
+            'name': bucket_name,
+            'creation_date': bucket['CreationDate'],
+            'region': 'Unknown',
+            'object_count': 0,
+            'size_bytes': 0,
+            'size_gb': 0
+        }
+
+        location, code = self._call_or_code(
+            self.s3.get_bucket_location, Bucket=bucket_name)
+        if code is not None:
+            bucket_info['region'] = f'Error: {code}'
+            return bucket_info
+        bucket_info['region'] = location.get('LocationConstraint', 'us-east-1')
+
+        # Bucket size and object count from the daily AWS/S3 storage
+        # metrics: constant-time per bucket, and accurate for buckets
+        # with millions of objects where listing keys would be both
+        # slow and truncated
+        bucket_size = self._get_bucket_storage_metric(
+            bucket_name, 'BucketSizeBytes', 'StandardStorage')
+        object_count = self._get_bucket_storage_metric(
+            bucket_name, 'NumberOfObjects', 'AllStorageTypes')
+
+        if bucket_size is None or object_count is None:
+            bucket_info['object_count'] = 'Access Denied'
+        else:
+            bucket_info['object_count'] = int(object_count)
+            bucket_info['size_bytes'] = int(bucket_size)
+            bucket_info['size_gb'] = round(bucket_size / (1024**3), 3)
+
+        return bucket_info
+
+    def _get_bucket_storage_metric(self, bucket_name: str, metric_name: str,
+                                   storage_type: str) -> Optional[float]:
+        """Read the latest daily AWS/S3 storage metric for a bucket.
+
+        Returns None when CloudWatch denies the call for this bucket.
+        """
+        end_time = datetime.now()
+        response, code = self._call_or_code(
+            self.cloudwatch.get_metric_statistics,
+            Namespace='AWS/S3',
+            MetricName=metric_name,
+            Dimensions=[
+                {'Name': 'BucketName', 'Value': bucket_name},
+                {'Name': 'StorageType', 'Value': storage_type}
+            ],
+            StartTime=end_time - timedelta(days=2),
+            EndTime=end_time,
+            Period=86400,
+            Statistics=['Average']
+        )
+        if code is not None:
+            return None
+
+        datapoints = response.get('Datapoints', [])
+        if not datapoints:
+            return 0.0
+        return max(datapoints, key=lambda point: point['Timestamp'])['Average']
     
-    def get_bedrock_usage_details(self) -> Dict[str, Any]:
-        """Get detailed Bedrock usage."""
+    @_daily_memo
+    def get_bedrock_usage_details(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Get detailed Bedrock usage.
+
+        Args:
+            limit: Cap on how many model summaries to keep; pagination
+                stops as soon as enough pages have been walked.
+        """
         try:
-            # Get available models
-            models_response = self.bedrock.list_foundation_models()
-            
-            available_models = []
-            for model in models_response.get('modelSummaries', []):
-                model_info = {
+            # Paginate the model listing and keep only the fields the
+            # report and export actually use; accounts see 100+ models
+            # and the modality/inference-type lists just bloat the JSON
+            if self.bedrock.can_paginate('list_foundation_models'):
+                pages = self.bedrock.get_paginator('list_foundation_models').paginate()
+                summaries = (model for page in pages
+                             for model in page.get('modelSummaries', []))
+            else:
+                summaries = iter(
+                    self.bedrock.list_foundation_models().get('modelSummaries', []))
+
+            available_models = [
+                {
                     'model_id': model['modelId'],
                     'model_name': model['modelName'],
-                    'provider_name': model['providerName'],
-                    'input_modalities': model.get('inputModalities', []),
-                    'output_modalities': model.get('outputModalities', []),
-                    'inference_types': model.get('inferenceTypesSupported', [])
+                    'provider_name': model['providerName']
                 }
-                available_models.append(model_info)
+                for model in itertools.islice(summaries, limit if limit is not None else 50)
+            ]
             
-            # Try to get usage metrics from CloudWatch
+            # Try to get usage metrics from CloudWatch. GetMetricData
+            # batches all four metrics in a single round-trip where
+            # GetMetricStatistics would need one call per metric
             try:
-                end_time = datetime.now()
+                _, _, end_time = self._window(7)
                 start_time = end_time - timedelta(days=7)
-                
-                metrics_response = self.cloudwatch.get_metric_statistics(
-                    Namespace='AWS/Bedrock',
-                    MetricName='Invocations',
+
+                queries = [
+                    {
+                        'Id': query_id,
+                        'MetricStat': {
+                            'Metric': {
+                                'Namespace': 'AWS/Bedrock',
+                                'MetricName': metric_name
+                            },
+                            'Period': 86400,  # 1 day
+                            'Stat': stat
+                        }
+                    }
+                    for query_id, metric_name, stat in (
+                        ('inv', 'Invocations', 'Sum'),
+                        ('tokens_in', 'InputTokenCount', 'Sum'),
+                        ('tokens_out', 'OutputTokenCount', 'Sum'),
+                        ('latency', 'InvocationLatency', 'Average')
+                    )
+                ]
+                metrics_response = self.cloudwatch.get_metric_data(
+                    MetricDataQueries=queries,
                     StartTime=start_time,
-                    EndTime=end_time,
-                    Period=86400,  # 1 day
-                    Statistics=['Sum']
+                    EndTime=end_time
                 )
-                
-                invocations = sum(point['Sum'] for point in metrics_response.get('Datapoints', []))
-                
+
+                values = {result['Id']: result.get('Values', [])
+                          for result in metrics_response.get('MetricDataResults', [])}
+                invocations = sum(values.get('inv', []))
+                input_tokens = sum(values.get('tokens_in', []))
+                output_tokens = sum(values.get('tokens_out', []))
+                latencies = values.get('latency', [])
+                avg_latency_ms = sum(latencies) / len(latencies) if latencies else 0.0
+
             except Exception:
                 invocations = 'Not available'
-            
+                input_tokens = output_tokens = avg_latency_ms = 'Not available'
+
             return {
                 'available_models': len(available_models),
                 'recent_invocations': invocations,
+                'recent_input_tokens': input_tokens,
+                'recent_output_tokens': output_tokens,
+                'avg_latency_ms': avg_latency_ms,
                 'models': available_models
             }
             
@@ -266,12 +526,15 @@ class AWSBillingMonitor:
             print(f"❌ Error getting Bedrock details: {e}")
             return {'available_models': 0, 'models': []}
     
+    @_daily_memo
     def get_monthly_forecast(self) -> Dict[str, Any]:
         """Get cost forecast for the current month."""
         try:
-            # Get forecast for the rest of the month
+            # Get forecast for the rest of the month. monthrange avoids
+            # the month+1 arithmetic that breaks in December.
             today = datetime.now()
-            end_of_month = datetime(today.year, today.month + 1, 1) - timedelta(days=1)
+            end_of_month = datetime(today.year, today.month,
+                                    calendar.monthrange(today.year, today.month)[1])
             
             response = self.cost_explorer.get_cost_forecast(
                 TimePeriod={
@@ -311,149 +574,189 @@ class AWSBillingMonitor:
             print(f"❌ Error getting cost forecast: {e}")
             return {}
     
+    @staticmethod
+    def _flatten_groups(response: Dict):
+        """Flatten a Cost Explorer response to (keys, amounts) columns.
+
+        Amounts land directly in a float64 array via np.fromiter, so the
+        string->float parse happens exactly once per group and the
+        grouped summation runs in C.
+        """
+        import numpy as np
+
+        all_groups = [group
+                      for result in response.get('ResultsByTime', [])
+                      for group in result.get('Groups', [])]
+        keys = [group['Keys'][0] for group in all_groups]
+        amounts = np.fromiter(
+            (float(group['Metrics']['BlendedCost']['Amount']) for group in all_groups),
+            dtype=np.float64, count=len(all_groups))
+        return keys, amounts
+
     def _process_cost_response(self, response: Dict) -> Dict[str, Any]:
         """Process Cost Explorer response."""
-        service_costs = {}
-        total_cost = 0.0
-        
-        for result in response.get('ResultsByTime', []):
-            for group in result.get('Groups', []):
-                service_name = group['Keys'][0]
-                cost = float(group['Metrics']['BlendedCost']['Amount'])
-                
-                if service_name not in service_costs:
-                    service_costs[service_name] = 0.0
-                
-                service_costs[service_name] += cost
-                total_cost += cost
-        
-        # Sort by cost (highest first)
-        sorted_services = sorted(service_costs.items(), key=lambda x: x[1], reverse=True)
-        
+        import pandas as pd  # deferred: ~300ms / ~70MB only paid when processing
+
+        services, amounts = self._flatten_groups(response)
+        if not services:
+            return {'total_cost': 0.0, 'service_breakdown': {}, 'top_services': []}
+
+        totals = pd.Series(amounts).groupby(services, sort=False).sum()
+
+        service_breakdown = {service: float(cost) for service, cost in totals.items()}
+
+        # Only the 10 biggest services are ever shown, so a partial
+        # selection beats sorting the whole breakdown
         return {
-            'total_cost': total_cost,
-            'service_breakdown': dict(sorted_services),
-            'top_services': sorted_services[:10]
+            'total_cost': float(totals.sum()),
+            'service_breakdown': service_breakdown,
+            'top_services': heapq.nlargest(10, service_breakdown.items(),
+                                           key=operator.itemgetter(1))
         }
-    
+
     def _process_service_cost_response(self, response: Dict) -> Dict[str, Any]:
         """Process service-specific cost response."""
-        total_cost = 0.0
-        usage_details = []
-        
-        for result in response.get('ResultsByTime', []):
-            for group in result.get('Groups', []):
-                usage_type = group['Keys'][0]
-                cost = float(group['Metrics']['BlendedCost']['Amount'])
-                
-                if cost > 0:
-                    usage_details.append({
-                        'usage_type': usage_type,
-                        'cost': cost
-                    })
-                    total_cost += cost
-        
+        import pandas as pd
+
+        usage_types, amounts = self._flatten_groups(response)
+        if not usage_types:
+            return {'total_cost': 0.0, 'usage_details': []}
+
+        series = pd.Series(amounts, index=usage_types)
+        totals = series[series > 0].groupby(level=0, sort=False).sum()
+
+        # Left unsorted: the report picks its top rows with nlargest and
+        # the JSON export doesn't care about ordering
         return {
-            'total_cost': total_cost,
-            'usage_details': sorted(usage_details, key=lambda x: x['cost'], reverse=True)
+            'total_cost': float(totals.sum()),
+            'usage_details': [{'usage_type': usage_type, 'cost': float(cost)}
+                              for usage_type, cost in totals.items()]
         }
     
+    def _fetch_report_sections(self, days: int) -> Dict[str, Any]:
+        """Fetch all report sections concurrently.
+
+        The six fetches are independent I/O, so dispatching them together
+        turns a sum-of-latencies report into a max-of-latencies one.
+        """
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = {
+                'overall_costs': executor.submit(self.get_overall_costs, days),
+                'forecast': executor.submit(self.get_monthly_forecast),
+                'ec2_details': executor.submit(self.get_ec2_usage_details),
+                's3_details': executor.submit(self.get_s3_usage_details),
+                'bedrock_details': executor.submit(self.get_bedrock_usage_details),
+                'service_costs': executor.submit(self.get_service_specific_costs, days)
+            }
+            return {name: future.result() for name, future in futures.items()}
+
     def generate_comprehensive_report(self, days: int = 30) -> None:
         """Generate a comprehensive billing report."""
-        print("\n" + "=" * 80)
-        print("🏦 COMPREHENSIVE AWS BILLING REPORT")
-        print("=" * 80)
-        print(f"📅 Analysis Period: Last {days} days")
-        print(f"🌍 Primary Region: {self.region}")
-        print(f"⏰ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
+        # Assemble the whole report in memory and emit it with a single
+        # write: one syscall instead of ~50 print() lock/write cycles,
+        # which keeps tee/ssh/log-collector pipes from dominating
+        buf = io.StringIO()
+        w = buf.write
+
+        w("\n" + "=" * 80 + "\n")
+        w("🏦 COMPREHENSIVE AWS BILLING REPORT\n")
+        w("=" * 80 + "\n")
+        w(f"📅 Analysis Period: Last {days} days\n")
+        w(f"🌍 Primary Region: {self.region}\n")
+        w(f"⏰ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+        sections = self._fetch_report_sections(days)
+
         # Overall costs
-        print(f"\n{'🔍 OVERALL COST ANALYSIS':<60}")
-        print("-" * 60)
-        
-        overall_costs = self.get_overall_costs(days)
+        w(f"\n{'🔍 OVERALL COST ANALYSIS':<60}\n")
+        w("-" * 60 + "\n")
+
+        overall_costs = sections['overall_costs']
         if overall_costs:
-            print(f"💰 Total Cost ({days} days): ${overall_costs['total_cost']:.2f}")
-            print(f"📊 Daily Average: ${overall_costs['total_cost']/days:.2f}")
-            
-            print(f"\n🏆 Top Services by Cost:")
+            w(f"💰 Total Cost ({days} days): ${overall_costs['total_cost']:.2f}\n")
+            w(f"📊 Daily Average: ${overall_costs['total_cost']/days:.2f}\n")
+
+            w("\n🏆 Top Services by Cost:\n")
             for i, (service, cost) in enumerate(overall_costs['top_services'][:5], 1):
                 percentage = (cost / overall_costs['total_cost']) * 100 if overall_costs['total_cost'] > 0 else 0
-                print(f"  {i}. {service:<40} ${cost:>8.2f} ({percentage:>5.1f}%)")
-        
+                w(_SERVICE_LINE.format_map(
+                    {'i': i, 'service': service, 'cost': cost, 'pct': percentage}))
+
         # Monthly forecast
-        print(f"\n{'📈 MONTHLY FORECAST':<60}")
-        print("-" * 60)
-        
-        forecast = self.get_monthly_forecast()
+        w(f"\n{'📈 MONTHLY FORECAST':<60}\n")
+        w("-" * 60 + "\n")
+
+        forecast = sections['forecast']
         if forecast:
-            print(f"📅 Month-to-Date: ${forecast['month_to_date']:.2f}")
-            print(f"🔮 Forecast Remaining: ${forecast['forecast_remaining']:.2f}")
-            print(f"📊 Projected Monthly Total: ${forecast['projected_total']:.2f}")
-            
+            w(f"📅 Month-to-Date: ${forecast['month_to_date']:.2f}\n")
+            w(f"🔮 Forecast Remaining: ${forecast['forecast_remaining']:.2f}\n")
+            w(f"📊 Projected Monthly Total: ${forecast['projected_total']:.2f}\n")
+
             daily_rate = forecast['month_to_date'] / forecast['days_elapsed'] if forecast['days_elapsed'] > 0 else 0
-            print(f"📈 Average Daily Spend: ${daily_rate:.2f}")
-        
+            w(f"📈 Average Daily Spend: ${daily_rate:.2f}\n")
+
         # Service-specific details
-        print(f"\n{'🔧 SERVICE DETAILS':<60}")
-        print("-" * 60)
-        
+        w(f"\n{'🔧 SERVICE DETAILS':<60}\n")
+        w("-" * 60 + "\n")
+
         # EC2 Details
-        ec2_details = self.get_ec2_usage_details()
-        print(f"\n🖥️  EC2 - Elastic Compute Cloud:")
-        print(f"   Total Instances: {ec2_details['total_instances']}")
-        print(f"   Running: {ec2_details['running_instances']}")
-        print(f"   Stopped: {ec2_details['stopped_instances']}")
-        
+        ec2_details = sections['ec2_details']
+        w("\n🖥️  EC2 - Elastic Compute Cloud:\n")
+        w(f"   Total Instances: {ec2_details['total_instances']}\n")
+        w(f"   Running: {ec2_details['running_instances']}\n")
+        w(f"   Stopped: {ec2_details['stopped_instances']}\n")
+
         if ec2_details['instances']:
-            print("   Recent Instances:")
+            w("   Recent Instances:\n")
             for instance in ec2_details['instances'][:3]:
-                print(f"     • {instance['name']} ({instance['instance_id']}) - {instance['instance_type']} - {instance['state']}")
-        
+                w(f"     • {instance['name']} ({instance['instance_id']}) - {instance['instance_type']} - {instance['state']}\n")
+
         # S3 Details
-        s3_details = self.get_s3_usage_details()
-        print(f"\n📦 S3 - Simple Storage Service:")
-        print(f"   Total Buckets: {s3_details['total_buckets']}")
-        print(f"   Total Objects: {s3_details['total_objects']}")
-        print(f"   Total Storage: {s3_details['total_size_gb']} GB")
-        
+        s3_details = sections['s3_details']
+        w("\n📦 S3 - Simple Storage Service:\n")
+        w(f"   Total Buckets: {s3_details['total_buckets']}\n")
+        w(f"   Total Objects: {s3_details['total_objects']}\n")
+        w(f"   Total Storage: {s3_details['total_size_gb']} GB\n")
+
         if s3_details['buckets']:
-            print("   Recent Buckets:")
+            w("   Recent Buckets:\n")
             for bucket in s3_details['buckets'][:3]:
-                print(f"     • {bucket['name']} - {bucket['size_gb']} GB ({bucket['object_count']} objects)")
-        
+                w(f"     • {bucket['name']} - {bucket['size_gb']} GB ({bucket['object_count']} objects)\n")
+
         # Bedrock Details
-        bedrock_details = self.get_bedrock_usage_details()
-        print(f"\n🤖 Bedrock - AI Foundation Models:")
-        print(f"   Available Models: {bedrock_details['available_models']}")
-        print(f"   Recent Invocations: {bedrock_details['recent_invocations']}")
-        
+        bedrock_details = sections['bedrock_details']
+        w("\n🤖 Bedrock - AI Foundation Models:\n")
+        w(f"   Available Models: {bedrock_details['available_models']}\n")
+        w(f"   Recent Invocations: {bedrock_details['recent_invocations']}\n")
+
         if bedrock_details['models']:
-            print("   Available Models:")
+            w("   Available Models:\n")
             for model in bedrock_details['models'][:5]:
-                print(f"     • {model['model_id']} ({model['provider_name']})")
-        
+                w(f"     • {model['model_id']} ({model['provider_name']})\n")
+
         # Service-specific costs
-        print(f"\n{'💳 DETAILED SERVICE COSTS':<60}")
-        print("-" * 60)
-        
-        service_costs = self.get_service_specific_costs(days)
+        w(f"\n{'💳 DETAILED SERVICE COSTS':<60}\n")
+        w("-" * 60 + "\n")
+
+        service_costs = sections['service_costs']
         for service, details in service_costs.items():
             if details['total_cost'] > 0:
-                print(f"\n💰 {service}: ${details['total_cost']:.4f}")
-                for usage in details['usage_details'][:3]:
-                    print(f"     • {usage['usage_type']}: ${usage['cost']:.4f}")
-        
+                w(f"\n💰 {service}: ${details['total_cost']:.4f}\n")
+                for usage in heapq.nlargest(3, details['usage_details'],
+                                             key=operator.itemgetter('cost')):
+                    w(_USAGE_LINE.format_map(usage))
+
         # Cost optimization recommendations
-        print(f"\n{'💡 COST OPTIMIZATION RECOMMENDATIONS':<60}")
-        print("-" * 60)
-        
-        self._generate_recommendations(overall_costs, ec2_details, s3_details, bedrock_details)
-        
-        print("\n" + "=" * 80)
-    
-    def _generate_recommendations(self, costs: Dict, ec2: Dict, s3: Dict, bedrock: Dict) -> None:
-        """Generate cost optimization recommendations."""
+        w(f"\n{'💡 COST OPTIMIZATION RECOMMENDATIONS':<60}\n")
+        w("-" * 60 + "\n")
+
+        self._generate_recommendations(overall_costs, ec2_details, s3_details, bedrock_details, w)
+
+        w("\n" + "=" * 80 + "\n")
+        sys.stdout.write(buf.getvalue())
+
+    def _generate_recommendations(self, costs: Dict, ec2: Dict, s3: Dict, bedrock: Dict, w) -> None:
+        """Generate cost optimization recommendations into the report buffer."""
         recommendations = []
         
         # EC2 recommendations
@@ -482,7 +785,7 @@ class AWSBillingMonitor:
         ])
         
         for i, rec in enumerate(recommendations[:8], 1):
-            print(f"  {i}. {rec}")
+            w(f"  {i}. {rec}\n")
     
     def export_report(self, filename: Optional[str] = None, days: int = 30) -> str:
         """Export billing report to JSON file."""
@@ -491,20 +794,31 @@ class AWSBillingMonitor:
             filename = f"aws_billing_report_{timestamp}.json"
         
         try:
+            sections = self._fetch_report_sections(days)
             report_data = {
                 'report_date': datetime.now().isoformat(),
                 'analysis_period_days': days,
                 'region': self.region,
-                'overall_costs': self.get_overall_costs(days),
-                'monthly_forecast': self.get_monthly_forecast(),
-                'ec2_details': self.get_ec2_usage_details(),
-                's3_details': self.get_s3_usage_details(),
-                'bedrock_details': self.get_bedrock_usage_details(),
-                'service_costs': self.get_service_specific_costs(days)
+                'overall_costs': sections['overall_costs'],
+                'monthly_forecast': sections['forecast'],
+                'ec2_details': sections['ec2_details'],
+                's3_details': sections['s3_details'],
+                'bedrock_details': sections['bedrock_details'],
+                'service_costs': sections['service_costs']
             }
             
-            with open(filename, 'w') as f:
-                json.dump(report_data, f, indent=2, default=str)
+            # orjson serializes datetimes natively in C; multi-MB reports
+            # with many EC2/S3 entries export several times faster
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(
+                        report_data,
+                        option=(orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC
+                                | orjson.OPT_SERIALIZE_NUMPY),
+                        default=str))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(report_data, f, indent=2, default=str)
             
             print(f"📁 Report exported to: {filename}")
             return filename
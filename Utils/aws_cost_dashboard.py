@@ -10,27 +10,177 @@ Date: August 2025
 """
 
 import boto3
+import botocore.config
+import hashlib
+import io
 import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List
+from decimal import Decimal
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional
 import time
 
+# One session shared across classes so the JSON service models load once
+_SESSION = boto3.Session()
+
+# Shared client config: adaptive retries back off under Cost Explorer
+# throttling and keep-alive avoids re-negotiating TLS between calls
+_CFG = botocore.config.Config(
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    connect_timeout=3,
+    read_timeout=30,
+    tcp_keepalive=True,
+    user_agent_extra='course-dev/1.0'
+)
+
+# Optional: C-extension JSON serialization for the log/snapshot files
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj, path: str) -> None:
+    """Write obj as indented JSON, via orjson when it is installed.
+
+    orjson serializes datetimes natively in C; the stdlib path with
+    default=str is kept as the fallback.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                obj,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC,
+                default=str))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=str)
+
+# Cost Explorer queries are billed ($0.01 each) and the underlying data
+# refreshes roughly daily, so monitor mode reuses responses this long
+CE_CACHE_TTL_SECONDS = 900
+
+# Closed days never change, so their responses persist on disk across
+# runs - daily cron lookbacks then cost zero API calls
+CACHE_DIR = Path.home() / '.cache' / 'aws-cost-dashboard'
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
 
 class AWSCostDashboard:
     """Simple AWS cost dashboard for quick monitoring."""
     
-    def __init__(self, region: str = 'us-east-1'):
+    def __init__(self, region: str = 'us-east-1', use_disk_cache: bool = True):
         """Initialize the cost dashboard."""
         self.region = region
-        
-        try:
-            self.cost_explorer = boto3.client('ce', region_name='us-east-1')
-            self.ec2 = boto3.client('ec2', region_name=region)
-            self.s3 = boto3.client('s3', region_name=region)
-            print(f"✅ Connected to AWS (Region: {region})")
-        except Exception as e:
-            print(f"❌ Error connecting to AWS: {e}")
-            raise
+        self.use_disk_cache = use_disk_cache
+        print(f"✅ Connected to AWS (Region: {region})")
+
+        self._ce_cache = {}
+        # Shared pool for fanning out independent API calls; sized so the
+        # nested submissions (dashboard sections -> per-section fetches)
+        # can all run without the outer tasks starving the inner ones
+        self._executor = ThreadPoolExecutor(max_workers=8)
+
+    # Clients are constructed on first use so a --snapshot-only or
+    # summary-only invocation never pays for the ones it skips
+
+    @cached_property
+    def cost_explorer(self):
+        return _SESSION.client('ce', region_name='us-east-1', config=_CFG)
+
+    @cached_property
+    def ec2(self):
+        return _SESSION.client('ec2', region_name=self.region, config=_CFG)
+
+    @cached_property
+    def s3(self):
+        return _SESSION.client('s3', region_name=self.region, config=_CFG)
+
+    @cached_property
+    def cloudwatch(self):
+        return _SESSION.client('cloudwatch', region_name=self.region, config=_CFG)
+
+    def _ce_query(self, start: str, end: str, granularity: str,
+                  group_by: Optional[List[Dict]] = None,
+                  ttl: int = CE_CACHE_TTL_SECONDS) -> Dict:
+        """Run get_cost_and_usage through a small TTL cache.
+
+        monitor_mode re-renders every five minutes, but the spending
+        data behind those renders changes far less often than that.
+        """
+        key = (start, end, granularity,
+               tuple(g['Key'] for g in group_by) if group_by else None)
+        cached = self._ce_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+
+        # Windows that closed before today are immutable; serve them
+        # from the on-disk cache across process restarts
+        cache_path = None
+        if self.use_disk_cache and end < datetime.now().strftime('%Y-%m-%d'):
+            digest = hashlib.md5(repr(key).encode()).hexdigest()
+            cache_path = CACHE_DIR / f"{digest}.json"
+            if cache_path.exists():
+                try:
+                    return json.loads(cache_path.read_text())
+                except Exception:
+                    pass  # unreadable entry; fall through to the API
+
+        kwargs = {
+            'TimePeriod': {'Start': start, 'End': end},
+            'Granularity': granularity,
+            'Metrics': ['BlendedCost'],
+            # Drop credit/refund/tax records server-side: fewer groups
+            # over the wire, and the totals reflect real spend
+            'Filter': {'Not': {'Dimensions': {
+                'Key': 'RECORD_TYPE',
+                'Values': ['Credit', 'Refund', 'Tax']
+            }}}
+        }
+        if group_by:
+            kwargs['GroupBy'] = group_by
+        response = self.cost_explorer.get_cost_and_usage(**kwargs)
+        self._ce_cache[key] = (now, response)
+
+        if cache_path is not None:
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_suffix('.tmp')
+                tmp_path.write_text(json.dumps(response, default=str))
+                os.replace(tmp_path, cache_path)  # atomic publish
+                self._evict_disk_cache()
+            except Exception:
+                pass  # caching is best-effort
+
+        return response
+
+    @staticmethod
+    def _evict_disk_cache() -> None:
+        """Keep the disk cache under its size cap, oldest-first."""
+        files = sorted(CACHE_DIR.glob('*.json'),
+                       key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in files)
+        while files and total > CACHE_MAX_BYTES:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+
+    def invalidate(self) -> None:
+        """Drop all cached Cost Explorer responses."""
+        self._ce_cache.clear()
+
+    def clear_cache(self) -> None:
+        """Drop both the in-memory and on-disk caches."""
+        self.invalidate()
+        if CACHE_DIR.exists():
+            for path in CACHE_DIR.glob('*.json'):
+                path.unlink(missing_ok=True)
     
     def get_quick_summary(self) -> Dict:
         """Get a quick cost summary for today and this month."""
@@ -39,46 +189,45 @@ class AWSCostDashboard:
         yesterday = today - timedelta(days=1)
         
         try:
-            # Month-to-date costs
-            mtd_response = self.cost_explorer.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_of_month.strftime('%Y-%m-%d'),
-                    'End': today.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['BlendedCost'],
-                GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+            # The MTD and yesterday queries are independent round-trips;
+            # run them concurrently (boto3 clients are thread-safe)
+            group_by = [{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+            mtd_future = self._executor.submit(
+                self._ce_query,
+                start_of_month.strftime('%Y-%m-%d'),
+                today.strftime('%Y-%m-%d'),
+                'MONTHLY',
+                group_by
             )
-            
-            # Yesterday's costs
-            yesterday_response = self.cost_explorer.get_cost_and_usage(
-                TimePeriod={
-                    'Start': yesterday.strftime('%Y-%m-%d'),
-                    'End': today.strftime('%Y-%m-%d')
-                },
-                Granularity='DAILY',
-                Metrics=['BlendedCost'],
-                GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+            yesterday_future = self._executor.submit(
+                self._ce_query,
+                yesterday.strftime('%Y-%m-%d'),
+                today.strftime('%Y-%m-%d'),
+                'DAILY',
+                group_by
             )
+            mtd_response = mtd_future.result()
+            yesterday_response = yesterday_future.result()
             
-            # Process responses
-            mtd_total = 0.0
+            # Process responses. Amounts come back as strings; Decimal
+            # parses once and keeps the totals exact for display
+            mtd_total = Decimal('0')
             mtd_services = {}
             
             for result in mtd_response.get('ResultsByTime', []):
                 for group in result.get('Groups', []):
                     service = group['Keys'][0]
-                    cost = float(group['Metrics']['BlendedCost']['Amount'])
+                    cost = Decimal(group['Metrics']['BlendedCost']['Amount'])
                     mtd_services[service] = cost
                     mtd_total += cost
             
-            yesterday_total = 0.0
+            yesterday_total = Decimal('0')
             yesterday_services = {}
             
             for result in yesterday_response.get('ResultsByTime', []):
                 for group in result.get('Groups', []):
                     service = group['Keys'][0]
-                    cost = float(group['Metrics']['BlendedCost']['Amount'])
+                    cost = Decimal(group['Metrics']['BlendedCost']['Amount'])
                     yesterday_services[service] = cost
                     yesterday_total += cost
             
@@ -92,7 +241,7 @@ class AWSCostDashboard:
                     'total': yesterday_total,
                     'services': yesterday_services
                 },
-                'daily_average': mtd_total / today.day if today.day > 0 else 0
+                'daily_average': mtd_total / today.day if today.day > 0 else Decimal('0')
             }
             
         except Exception as e:
@@ -107,75 +256,165 @@ class AWSCostDashboard:
             'region': self.region
         }
         
+        # EC2 and S3 listings have no data dependency; dispatch together
+        ec2_future = self._executor.submit(self._count_instance_states)
+        s3_future = self._executor.submit(self.s3.list_buckets)
+
         # EC2 instances
         try:
-            ec2_response = self.ec2.describe_instances()
-            for reservation in ec2_response['Reservations']:
-                for instance in reservation['Instances']:
-                    resources['ec2_instances']['total'] += 1
-                    if instance['State']['Name'] == 'running':
-                        resources['ec2_instances']['running'] += 1
-                    elif instance['State']['Name'] == 'stopped':
-                        resources['ec2_instances']['stopped'] += 1
+            state_counts = ec2_future.result()
+            resources['ec2_instances']['running'] = state_counts['running']
+            resources['ec2_instances']['stopped'] = state_counts['stopped']
+            resources['ec2_instances']['total'] = sum(state_counts.values())
         except Exception as e:
             print(f"⚠️  Could not get EC2 data: {e}")
         
-        # S3 buckets (basic count only for speed)
+        # S3 buckets: count from the listing, total size from a single
+        # batched CloudWatch query rather than per-bucket object listing
         try:
-            s3_response = self.s3.list_buckets()
-            resources['s3_buckets']['count'] = len(s3_response.get('Buckets', []))
+            s3_response = s3_future.result()
+            buckets = s3_response.get('Buckets', [])
+            resources['s3_buckets']['count'] = len(buckets)
+            resources['s3_buckets']['total_size_gb'] = self._s3_total_size_gb(buckets)
         except Exception as e:
             print(f"⚠️  Could not get S3 data: {e}")
         
         return resources
+
+    def _s3_total_size_gb(self, buckets: List[Dict]) -> float:
+        """Sum bucket storage from the daily AWS/S3 size metric.
+
+        One GetMetricData call batches up to 500 per-bucket queries, so
+        the API cost stays O(1) in the bucket count - listing objects
+        per bucket would be O(objects) and far slower.
+        """
+        if not buckets:
+            return 0
+        now = datetime.now()
+        queries = [
+            {
+                'Id': f'b{i}',
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': 'AWS/S3',
+                        'MetricName': 'BucketSizeBytes',
+                        'Dimensions': [
+                            {'Name': 'BucketName', 'Value': bucket['Name']},
+                            {'Name': 'StorageType', 'Value': 'StandardStorage'}
+                        ]
+                    },
+                    'Period': 86400,
+                    'Stat': 'Average'
+                }
+            }
+            for i, bucket in enumerate(buckets[:500])
+        ]
+        response = self.cloudwatch.get_metric_data(
+            MetricDataQueries=queries,
+            StartTime=now - timedelta(days=2),
+            EndTime=now
+        )
+        total_bytes = sum(result['Values'][0]
+                          for result in response.get('MetricDataResults', [])
+                          if result.get('Values'))
+        return round(total_bytes / (1024 ** 3), 3)
+
+    def _count_instance_states(self) -> Counter:
+        """Count EC2 instances by state without materializing them.
+
+        Pagination keeps large accounts from being truncated, the
+        server-side state filter trims the payload to the states the
+        dashboard reports, and streaming into a Counter holds one page
+        in memory at a time.
+        """
+        counts = Counter()
+        paginator = self.ec2.get_paginator('describe_instances')
+        pages = paginator.paginate(
+            Filters=[{'Name': 'instance-state-name',
+                      'Values': ['running', 'stopped']}],
+            PaginationConfig={'PageSize': 1000}
+        )
+        for page in pages:
+            for reservation in page['Reservations']:
+                counts.update(instance['State']['Name']
+                              for instance in reservation['Instances'])
+        return counts
     
     def display_dashboard(self) -> None:
-        """Display a simple cost dashboard."""
-        print("\n" + "=" * 60)
-        print("💰 AWS COST DASHBOARD")
-        print("=" * 60)
-        print(f"🕐 Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"🌍 Region: {self.region}")
-        
-        # Get cost summary
-        print("\n📊 COST SUMMARY")
-        print("-" * 30)
+        """Display the cost dashboard with a single stdout write."""
+        sys.stdout.write(self._render_dashboard())
+        sys.stdout.flush()
+
+    def _render_dashboard(self) -> str:
+        """Build the dashboard as one string.
+
+        Buffering replaces ~30 separate print syscalls per render -
+        noticeable in monitor mode when output is piped or logged.
+        """
+        now = datetime.now()  # single as-of timestamp for the render
+        buf = io.StringIO()
+        w = buf.write
+
+        w("\n" + "=" * 60 + "\n")
+        w("💰 AWS COST DASHBOARD\n")
+        w("=" * 60 + "\n")
+        w(f"🕐 Updated: {now.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        w(f"🌍 Region: {self.region}\n")
+
+        # Start both dashboard sections at once so the render takes
+        # max(call time) instead of the sum
+        summary_future = self._executor.submit(self.get_quick_summary)
+        resources_future = self._executor.submit(self.get_resource_counts)
+
+        # Cost summary
+        w("\n📊 COST SUMMARY\n")
+        w("-" * 30 + "\n")
         
-        summary = self.get_quick_summary()
+        try:
+            summary = summary_future.result()
+        except Exception as e:
+            w(f"❌ Error getting cost summary: {e}\n")
+            summary = {}
         if summary:
             mtd = summary['month_to_date']
             yesterday = summary['yesterday']
             
-            print(f"💳 Month-to-Date: ${mtd['total']:.2f}")
-            print(f"📅 Yesterday: ${yesterday['total']:.2f}")
-            print(f"📈 Daily Average: ${summary['daily_average']:.2f}")
-            print(f"📆 Days Elapsed: {mtd['days_elapsed']}")
+            w(f"💳 Month-to-Date: ${mtd['total']:.2f}\n")
+            w(f"📅 Yesterday: ${yesterday['total']:.2f}\n")
+            w(f"📈 Daily Average: ${summary['daily_average']:.2f}\n")
+            w(f"📆 Days Elapsed: {mtd['days_elapsed']}\n")
             
             # Top services this month
             if mtd['services']:
                 top_services = sorted(mtd['services'].items(), key=lambda x: x[1], reverse=True)[:5]
-                print(f"\n🏆 Top Services (MTD):")
+                w("\n🏆 Top Services (MTD):\n")
                 for i, (service, cost) in enumerate(top_services, 1):
                     if cost > 0:
                         percentage = (cost / mtd['total']) * 100 if mtd['total'] > 0 else 0
-                        print(f"  {i}. {service:<30} ${cost:>6.2f} ({percentage:>4.1f}%)")
+                        w(f"  {i}. {service:<30} ${cost:>6.2f} ({percentage:>4.1f}%)\n")
         
-        # Get resource counts
-        print(f"\n🔧 RESOURCE OVERVIEW")
-        print("-" * 30)
+        # Resource counts
+        w("\n🔧 RESOURCE OVERVIEW\n")
+        w("-" * 30 + "\n")
         
-        resources = self.get_resource_counts()
+        try:
+            resources = resources_future.result()
+        except Exception as e:
+            w(f"⚠️  Could not get resource counts: {e}\n")
+            resources = {'ec2_instances': {'running': 0, 'stopped': 0, 'total': 0},
+                         's3_buckets': {'count': 0, 'total_size_gb': 0},
+                         'region': self.region}
         
-        print(f"🖥️  EC2 Instances:")
-        print(f"   Total: {resources['ec2_instances']['total']}")
-        print(f"   Running: {resources['ec2_instances']['running']}")
-        print(f"   Stopped: {resources['ec2_instances']['stopped']}")
+        w("🖥️  EC2 Instances:\n")
+        w(f"   Total: {resources['ec2_instances']['total']}\n")
+        w(f"   Running: {resources['ec2_instances']['running']}\n")
+        w(f"   Stopped: {resources['ec2_instances']['stopped']}\n")
         
-        print(f"📦 S3 Buckets: {resources['s3_buckets']['count']}")
+        w(f"📦 S3 Buckets: {resources['s3_buckets']['count']}\n")
         
         # Quick alerts
-        print(f"\n⚠️  ALERTS")
-        print("-" * 30)
+        w("\n⚠️  ALERTS\n")
+        w("-" * 30 + "\n")
         
         alerts = []
         
@@ -192,26 +431,68 @@ class AWSCostDashboard:
             alerts.append("✅ No cost alerts")
         
         for alert in alerts:
-            print(f"  • {alert}")
+            w(f"  • {alert}\n")
         
-        print("\n" + "=" * 60)
+        w("\n" + "=" * 60 + "\n")
+        return buf.getvalue()
     
+    def ensure_anomaly_monitor(self, name: str = 'course-dev-monitor',
+                               sns_topic_arn: str = None,
+                               threshold_usd: float = 10.0) -> str:
+        """Idempotently set up Cost Anomaly Detection for push alerts.
+
+        Creates a SERVICE-dimension anomaly monitor (and, when an SNS
+        topic is supplied, an IMMEDIATE subscription to it) so cost
+        spikes arrive as events instead of requiring constant polling.
+        """
+        existing = self.cost_explorer.get_anomaly_monitors().get('AnomalyMonitors', [])
+        monitor_arn = next((m['MonitorArn'] for m in existing
+                            if m.get('MonitorName') == name), None)
+        if monitor_arn is None:
+            monitor_arn = self.cost_explorer.create_anomaly_monitor(
+                AnomalyMonitor={
+                    'MonitorName': name,
+                    'MonitorType': 'DIMENSIONAL',
+                    'MonitorDimension': 'SERVICE'
+                }
+            )['MonitorArn']
+            print(f"✅ Created anomaly monitor: {name}")
+
+        if sns_topic_arn:
+            subscription_name = f'{name}-subscription'
+            subscriptions = self.cost_explorer.get_anomaly_subscriptions().get(
+                'AnomalySubscriptions', [])
+            if not any(sub.get('SubscriptionName') == subscription_name
+                       for sub in subscriptions):
+                self.cost_explorer.create_anomaly_subscription(
+                    AnomalySubscription={
+                        'SubscriptionName': subscription_name,
+                        'MonitorArnList': [monitor_arn],
+                        'Subscribers': [{'Type': 'SNS', 'Address': sns_topic_arn}],
+                        'Threshold': threshold_usd,
+                        'Frequency': 'IMMEDIATE'
+                    }
+                )
+                print(f"✅ Subscribed {sns_topic_arn} to anomaly alerts")
+
+        return monitor_arn
+
     def save_daily_snapshot(self) -> str:
         """Save a daily cost snapshot for tracking."""
-        today = datetime.now().strftime('%Y-%m-%d')
+        now = datetime.now()  # one read keeps date and timestamp consistent
+        today = now.strftime('%Y-%m-%d')
         filename = f"daily_cost_snapshot_{today}.json"
         
         try:
             snapshot = {
                 'date': today,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'region': self.region,
                 'summary': self.get_quick_summary(),
                 'resources': self.get_resource_counts()
             }
             
-            with open(filename, 'w') as f:
-                json.dump(snapshot, f, indent=2, default=str)
+            _dump_json(snapshot, filename)
             
             print(f"📸 Daily snapshot saved: {filename}")
             return filename
@@ -221,18 +502,53 @@ class AWSCostDashboard:
             return ""
 
 
-def monitor_mode():
-    """Continuous monitoring mode - updates every 5 minutes."""
-    dashboard = AWSCostDashboard()
-    
+def monitor_mode(region: str = 'us-east-1', queue_url: str = None):
+    """Continuous monitoring mode.
+
+    With an SQS queue URL (fed by a Cost Anomaly Detection SNS topic -
+    see ensure_anomaly_monitor), the loop long-polls and renders only
+    when an anomaly event actually arrives, instead of burning billed
+    Cost Explorer calls every 5 minutes against data that refreshes
+    roughly daily. Without a queue it falls back to timed polling.
+    """
+    dashboard = AWSCostDashboard(region=region)
+
+    if queue_url:
+        sqs = _SESSION.client('sqs', region_name=region, config=_CFG)
+        print("🔄 Waiting for cost anomaly events (push mode)...")
+        print("   Press Ctrl+C to stop.")
+        try:
+            while True:
+                messages = sqs.receive_message(
+                    QueueUrl=queue_url,
+                    WaitTimeSeconds=20,
+                    MaxNumberOfMessages=10
+                ).get('Messages', [])
+                if not messages:
+                    continue
+                dashboard.invalidate()
+                dashboard.display_dashboard()
+                sqs.delete_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[{'Id': message['MessageId'],
+                              'ReceiptHandle': message['ReceiptHandle']}
+                             for message in messages]
+                )
+        except KeyboardInterrupt:
+            print(f"\n👋 Monitoring stopped.")
+        return
+
     print("🔄 Starting continuous monitoring mode...")
     print("   Updates every 5 minutes. Press Ctrl+C to stop.")
     
     try:
         while True:
+            cycle_start = time.monotonic()
             dashboard.display_dashboard()
             print(f"\n⏳ Next update in 5 minutes... (Ctrl+C to stop)")
-            time.sleep(300)  # 5 minutes
+            # Sleep for whatever remains of the 5-minute cycle so the
+            # schedule doesn't drift by the render time each round
+            time.sleep(max(0.0, 300 - (time.monotonic() - cycle_start)))
             
     except KeyboardInterrupt:
         print(f"\n👋 Monitoring stopped.")
@@ -245,15 +561,19 @@ def main():
     parser = argparse.ArgumentParser(description='AWS Cost Dashboard')
     parser.add_argument('--region', '-r', type=str, default='us-east-1', help='AWS region')
     parser.add_argument('--monitor', '-m', action='store_true', help='Continuous monitoring mode')
+    parser.add_argument('--queue-url', '-q', type=str, default=None,
+                        help='SQS queue fed by Cost Anomaly Detection; enables push-based monitoring')
     parser.add_argument('--snapshot', '-s', action='store_true', help='Save daily snapshot')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk Cost Explorer cache')
     
     args = parser.parse_args()
     
     try:
-        dashboard = AWSCostDashboard(region=args.region)
+        dashboard = AWSCostDashboard(region=args.region,
+                                     use_disk_cache=not args.no_cache)
         
         if args.monitor:
-            monitor_mode()
+            monitor_mode(region=args.region, queue_url=args.queue_url)
         else:
             dashboard.display_dashboard()
             
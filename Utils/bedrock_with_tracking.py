@@ -9,19 +9,156 @@ Author: AWS AI Engineering Course
 Date: August 2025
 """
 
+import asyncio
+import atexit
+import hashlib
 import json
+import threading
+import time
 import boto3
+import botocore.config
+from collections import OrderedDict
 from typing import Dict, Any
 from token_tracker import TokenTracker
 
+# Exact-match response cache entries kept per client instance
+RESPONSE_CACHE_MAXSIZE = 256
+
+# Adaptive retries and keep-alive: batch loops reuse the warm TLS
+# connection and back off cleanly when Bedrock throttles
+_CFG = botocore.config.Config(
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    connect_timeout=3,
+    read_timeout=30,
+    tcp_keepalive=True,
+    user_agent_extra='course-dev/1.0'
+)
+
+# Optional: event-loop Bedrock client for concurrent batch invocations
+try:
+    import aioboto3
+except ImportError:
+    aioboto3 = None
+
+# Optional: C-extension JSON codec for the ~1-5KB request/response
+# bodies on every invocation; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps  # returns bytes; invoke_model accepts bytes
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
 
 class BedrockWithTracking:
     """Bedrock client with built-in token tracking."""
     
     def __init__(self, region_name: str = 'us-east-1', session_file: str = None):
         """Initialize Bedrock client with token tracking."""
-        self.bedrock_runtime = boto3.client('bedrock-runtime', region_name=region_name)
-        self.tracker = TokenTracker(session_file)
+        self.region_name = region_name
+        self.bedrock_runtime = boto3.client('bedrock-runtime', region_name=region_name, config=_CFG)
+        # autosave off: tracking records accumulate in memory and a
+        # background thread flushes them, so invocations never stall on
+        # rewriting the session file
+        self.tracker = TokenTracker(session_file, autosave=False)
+        self._track_lock = None  # created on first async invocation
+        self._flush_interval = 5.0
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
+        # (build, extract) closure pairs specialized per model id, so the
+        # family sniffing and dict shaping happen once, not per call
+        self._builders = {}
+        # Exact-match LRU over parsed responses: repeated prompts skip
+        # the full API latency and token cost entirely
+        self._resp_cache = OrderedDict()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self._flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Persist any tracking records accumulated since the last flush."""
+        with self._flush_lock:
+            if not self._dirty:
+                return
+            self.tracker.flush()
+            self._dirty = False
+
+    @staticmethod
+    def _cache_key(model_id: str, prompt: str, kwargs: Dict) -> tuple:
+        return (model_id,
+                hashlib.sha1(prompt.encode('utf-8')).hexdigest(),
+                kwargs.get('max_tokens', 1000),
+                round(kwargs.get('temperature', 0.7), 3),
+                round(kwargs.get('top_p', 0.9), 3))
+
+    def invalidate(self, prompt: str = None) -> None:
+        """Drop cached responses, or only those matching one prompt."""
+        if prompt is None:
+            self._resp_cache.clear()
+            return
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+        for key in [k for k in self._resp_cache if k[1] == digest]:
+            del self._resp_cache[key]
+
+    def _builder_for(self, model_id: str):
+        """Return the (build_body, extract) pair for a model id.
+
+        The pair is chosen on first use and cached, keeping repeated
+        invocations in a batch loop free of per-call substring tests.
+        """
+        cached = self._builders.get(model_id)
+        if cached is not None:
+            return cached
+
+        if 'nova' in model_id.lower():
+            def build_body(prompt: str, kwargs: Dict) -> bytes:
+                return _json_dumps({
+                    "schemaVersion": "messages-v1",
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": [{"text": prompt}]
+                        }
+                    ],
+                    "inferenceConfig": {
+                        "maxTokens": kwargs.get('max_tokens', 1000),
+                        "temperature": kwargs.get('temperature', 0.7),
+                        "topP": kwargs.get('top_p', 0.9)
+                    }
+                })
+
+            def extract(response_body: Dict):
+                content = response_body['output']['message']['content'][0]['text']
+                usage = response_body.get('usage', {})
+                return content, usage.get('inputTokens', 0), usage.get('outputTokens', 0)
+        else:
+            # For Claude models
+            def build_body(prompt: str, kwargs: Dict) -> bytes:
+                return _json_dumps({
+                    "anthropic_version": "bedrock-2023-05-31",
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": kwargs.get('max_tokens', 1000),
+                    "temperature": kwargs.get('temperature', 0.7)
+                })
+
+            def extract(response_body: Dict):
+                content = response_body['content'][0]['text']
+                usage = response_body.get('usage', {})
+                return content, usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+
+        self._builders[model_id] = (build_body, extract)
+        return build_body, extract
         
     def invoke_with_tracking(self, model_id: str, prompt: str, **kwargs) -> Dict[str, Any]:
         """
@@ -35,54 +172,41 @@ class BedrockWithTracking:
         Returns:
             Dict containing response and tracking info
         """
-        # Prepare request body based on model
-        if 'nova' in model_id.lower():
-            request_body = {
-                "schemaVersion": "messages-v1",
-                "messages": [
-                    {
-                        "role": "user", 
-                        "content": [{"text": prompt}]
-                    }
-                ],
-                "inferenceConfig": {
-                    "maxTokens": kwargs.get('max_tokens', 1000),
-                    "temperature": kwargs.get('temperature', 0.7),
-                    "topP": kwargs.get('top_p', 0.9)
-                }
-            }
-        else:
-            # For Claude models
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": kwargs.get('max_tokens', 1000),
-                "temperature": kwargs.get('temperature', 0.7)
-            }
+        # strict callers opt out of caching for sampling temperatures
+        # where replaying an old completion would be misleading
+        strict = kwargs.pop('strict', False)
+        cacheable = not (strict and kwargs.get('temperature', 0.7) > 0.3)
+
+        if cacheable:
+            key = self._cache_key(model_id, prompt, kwargs)
+            cached = self._resp_cache.get(key)
+            if cached is not None:
+                self._resp_cache.move_to_end(key)
+                # Record the hit with zero tokens: the request happened,
+                # but nothing was billed
+                tracking_info = self.tracker.track_request(
+                    model_id=model_id,
+                    input_tokens=0,
+                    output_tokens=0,
+                    prompt=prompt,
+                    response=cached['content']
+                )
+                self._dirty = True
+                return {**cached, 'tracking': tracking_info, 'cached': True}
+
+        build_body, extract = self._builder_for(model_id)
         
         try:
             # Make the API call
             response = self.bedrock_runtime.invoke_model(
                 modelId=model_id,
-                body=json.dumps(request_body),
+                body=build_body(prompt, kwargs),
                 contentType='application/json'
             )
             
             # Parse response
-            response_body = json.loads(response['body'].read())
-            
-            # Extract content and usage info
-            if 'nova' in model_id.lower():
-                content = response_body['output']['message']['content'][0]['text']
-                usage = response_body.get('usage', {})
-                input_tokens = usage.get('inputTokens', 0)
-                output_tokens = usage.get('outputTokens', 0)
-            else:
-                # For Claude models
-                content = response_body['content'][0]['text']
-                usage = response_body.get('usage', {})
-                input_tokens = usage.get('input_tokens', 0)
-                output_tokens = usage.get('output_tokens', 0)
+            response_body = _json_loads(response['body'].read())
+            content, input_tokens, output_tokens = extract(response_body)
             
             # Track the request
             tracking_info = self.tracker.track_request(
@@ -92,8 +216,9 @@ class BedrockWithTracking:
                 prompt=prompt,
                 response=content
             )
+            self._dirty = True
             
-            return {
+            result = {
                 'content': content,
                 'usage': {
                     'input_tokens': input_tokens,
@@ -103,6 +228,14 @@ class BedrockWithTracking:
                 'tracking': tracking_info,
                 'raw_response': response_body
             }
+
+            if cacheable:
+                cache_entry = {k: v for k, v in result.items() if k != 'tracking'}
+                self._resp_cache[key] = cache_entry
+                if len(self._resp_cache) > RESPONSE_CACHE_MAXSIZE:
+                    self._resp_cache.popitem(last=False)
+
+            return result
             
         except Exception as e:
             print(f"❌ Error invoking model: {e}")
@@ -113,6 +246,67 @@ class BedrockWithTracking:
                 'tracking': None
             }
     
+    async def ainvoke_with_tracking(self, model_id: str, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Async variant of invoke_with_tracking for concurrent batches.
+
+        Awaiting several of these under asyncio.gather overlaps the
+        network waits, so a batch finishes in roughly the slowest call's
+        time instead of the sum. Requires aioboto3.
+        """
+        if aioboto3 is None:
+            raise RuntimeError(
+                "aioboto3 is not installed; use invoke_with_tracking instead")
+
+        build_body, extract = self._builder_for(model_id)
+        if self._track_lock is None:
+            self._track_lock = asyncio.Lock()
+
+        try:
+            session = aioboto3.Session()
+            async with session.client('bedrock-runtime',
+                                      region_name=self.region_name,
+                                      config=_CFG) as runtime:
+                response = await runtime.invoke_model(
+                    modelId=model_id,
+                    body=build_body(prompt, kwargs),
+                    contentType='application/json'
+                )
+                payload = await response['body'].read()
+        except Exception as e:
+            print(f"❌ Error invoking model: {e}")
+            return {
+                'error': str(e),
+                'content': None,
+                'usage': None,
+                'tracking': None
+            }
+
+        response_body = _json_loads(payload)
+        content, input_tokens, output_tokens = extract(response_body)
+
+        # The tracker mutates shared session state; serialize access so
+        # gathered invocations don't interleave their writes
+        async with self._track_lock:
+            tracking_info = self.tracker.track_request(
+                model_id=model_id,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                prompt=prompt,
+                response=content
+            )
+            self._dirty = True
+
+        return {
+            'content': content,
+            'usage': {
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+                'total_tokens': input_tokens + output_tokens
+            },
+            'tracking': tracking_info,
+            'raw_response': response_body
+        }
+
     def get_session_summary(self) -> Dict:
         """Get current session tracking summary."""
         return self.tracker.get_session_summary()
@@ -143,16 +337,35 @@ def main():
     
     model_id = "amazon.nova-lite-v1:0"
     
-    for i, prompt in enumerate(test_prompts, 1):
+    # With aioboto3 installed the three independent prompts run
+    # concurrently; otherwise fall back to the sequential path
+    if aioboto3 is not None:
+        async def _run_batch():
+            return await asyncio.gather(*(
+                client.ainvoke_with_tracking(
+                    model_id=model_id,
+                    prompt=prompt,
+                    max_tokens=500,
+                    temperature=0.7
+                )
+                for prompt in test_prompts
+            ))
+
+        results = asyncio.run(_run_batch())
+    else:
+        results = [
+            client.invoke_with_tracking(
+                model_id=model_id,
+                prompt=prompt,
+                max_tokens=500,
+                temperature=0.7
+            )
+            for prompt in test_prompts
+        ]
+    
+    for i, (prompt, result) in enumerate(zip(test_prompts, results), 1):
         print(f"\n🔄 Request {i}: {prompt}")
         
-        result = client.invoke_with_tracking(
-            model_id=model_id,
-            prompt=prompt,
-            max_tokens=500,
-            temperature=0.7
-        )
-        
         if result.get('error'):
             print(f"❌ Error: {result['error']}")
             continue
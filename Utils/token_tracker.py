@@ -10,20 +10,116 @@ Author: AWS AI Engineering Course
 Date: August 2025
 """
 
+import atexit
 import json
+import sys
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, Optional, Sequence
 from pathlib import Path
 
+# Optional: C-extension JSON codec. Session saves happen on every
+# tracked request, so the faster dumps is worth having when installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Stored prompt/response previews are capped at this many characters
+_PREVIEW_LEN = 100
+
+# In-memory request records kept per session; the JSONL file holds the
+# full history, so memory stays bounded no matter how long the session
+_RECENT_MAXLEN = 1000
+
+
+def _preview(text: str) -> str:
+    """Single-slice truncation; no intermediate concat for short text."""
+    return text if len(text) <= _PREVIEW_LEN else f"{text[:_PREVIEW_LEN]}..."
+
+
+@lru_cache(maxsize=1024)
+def _format_hms(ts) -> str:
+    """Clock-time string for an epoch second or legacy ISO timestamp.
+
+    Printing the recent-request list re-renders the same records each
+    time, so the formatted form is cached per distinct timestamp.
+    """
+    if isinstance(ts, str):
+        return datetime.fromisoformat(ts).strftime('%H:%M:%S')
+    return time.strftime('%H:%M:%S', time.localtime(ts))
+
+
+class _Summary:
+    """Running session totals.
+
+    Slotted attributes make the per-request updates plain attribute
+    stores; the dict form is materialized only for display and export.
+    """
+    __slots__ = ('in_tok', 'out_tok', 'cost_micro', 'count', 'last')
+
+    def __init__(self, in_tok: int = 0, out_tok: int = 0,
+                 cost_micro: int = 0, count: int = 0, last=None):
+        self.in_tok = in_tok
+        self.out_tok = out_tok
+        # Integer micro-dollars; converted to dollars only for display
+        self.cost_micro = cost_micro
+        self.count = count
+        self.last = last
+
+    def as_dict(self) -> Dict:
+        data = {
+            'total_input_tokens': self.in_tok,
+            'total_output_tokens': self.out_tok,
+            'total_cost': self.cost_micro / 1e6,
+            'request_count': self.count
+        }
+        if self.last is not None:
+            data['last_updated'] = self.last
+        return data
+
 
 class TokenTracker:
     """Track tokens and costs for the current session."""
     
-    def __init__(self, session_file: Optional[str] = None):
-        """Initialize the token tracker."""
+    def __init__(self, session_file: Optional[str] = None, autosave: bool = True,
+                 flush_every: int = 50, store_previews: bool = False):
+        """Initialize the token tracker.
+
+        Args:
+            session_file: Path for the session log.
+            autosave: Persist tracked requests automatically. Callers
+                that batch their own flushes (see flush()) can disable
+                this to keep disk I/O out of the request hot path.
+            flush_every: With autosave, coalesce this many records (or
+                64 KB of serialized data, whichever comes first) into a
+                single write instead of touching the disk per request.
+            store_previews: Keep 100-char prompt/response previews in
+                each record. Off by default - previews dominate the log
+                size once prompts get long and most callers only need
+                the token and cost columns.
+        """
         self.session_file = session_file or "ai_session_log.json"
-        self.session_data = self._load_session()
+        # Request records append to a JSON Lines file and the summary
+        # lives in a small sidecar, so tracking a request never rewrites
+        # the full (growing) history
+        base = Path(self.session_file)
+        self._requests_path = base.with_suffix('.jsonl')
+        self._summary_path = base.with_suffix('.summary.json')
+        self._fh = None
+        self._buf = bytearray()
+        self._buf_limit = 64 * 1024
+        self._buf_count = 0
+        self.flush_every = flush_every
+        self.store_previews = store_previews
+        self.autosave = autosave
+        # Loaded lazily: appending records never needs the historic log,
+        # so write-only callers skip the read and parse entirely
+        self._session_data = None
+        atexit.register(self.flush)
         
         # Pricing per 1K tokens (as of August 2025) - in dollars
         self.pricing = {
@@ -40,44 +136,107 @@ class TokenTracker:
                 'output': 1.25      # $1.25 per 1K output tokens
             }
         }
+        # Per-token rates in integer micro-dollars, derived once: the
+        # per-request math is exact integer multiplies, so the running
+        # total never accumulates float error
+        self._cost_table = {
+            model_id: (round(rates['input'] * 1000), round(rates['output'] * 1000))
+            for model_id, rates in self.pricing.items()
+        }
     
+    @property
+    def session_data(self) -> Dict:
+        """Session dict, loading the persisted session on first access."""
+        if self._session_data is None:
+            self._session_data = self._load_session()
+        return self._session_data
+
+    @staticmethod
+    def _new_session() -> Dict:
+        return {
+            'session_start': datetime.now().isoformat(),
+            'requests': deque(maxlen=_RECENT_MAXLEN),
+            'summary': _Summary()
+        }
+
     def _load_session(self) -> Dict:
         """Load existing session data or create new session."""
-        session_path = Path(self.session_file)
-        
-        if session_path.exists():
+        loads = orjson.loads if orjson is not None else json.loads
+
+        if self._requests_path.exists():
             try:
-                with open(session_path, 'r') as f:
-                    data = json.load(f)
-                print(f"📊 Loaded existing session: {len(data.get('requests', []))} previous requests")
-                return data
+                # Totals accumulate while streaming; only the most
+                # recent records stay resident
+                requests = deque(maxlen=_RECENT_MAXLEN)
+                summary = _Summary()
+                with open(self._requests_path, 'rb') as f:
+                    # Stream line-by-line; never parse the file as one blob
+                    for line in f:
+                        if line.strip():
+                            record = loads(line)
+                            requests.append(record)
+                            summary.in_tok += record['input_tokens']
+                            summary.out_tok += record['output_tokens']
+                            summary.cost_micro += round(record['total_cost'] * 1e6)
+                            summary.count += 1
+                session_start = datetime.now().isoformat()
+                if self._summary_path.exists():
+                    sidecar = loads(self._summary_path.read_bytes())
+                    session_start = sidecar.get('session_start', session_start)
+                if requests:
+                    summary.last = requests[-1]['timestamp']
+
+                print(f"📊 Loaded existing session: {summary.count} previous requests")
+                return {
+                    'session_start': session_start,
+                    'requests': requests,
+                    'summary': summary
+                }
             except Exception as e:
                 print(f"⚠️  Could not load session file: {e}")
         
         # Create new session
-        new_session = {
-            'session_start': datetime.now().isoformat(),
-            'requests': [],
-            'summary': {
-                'total_input_tokens': 0,
-                'total_output_tokens': 0,
-                'total_cost': 0.0,
-                'request_count': 0
-            }
-        }
         print("🆕 Created new tracking session")
-        return new_session
+        return self._new_session()
     
     def _save_session(self) -> None:
-        """Save session data to file."""
+        """Persist the summary sidecar (records append as they arrive)."""
         try:
-            with open(self.session_file, 'w') as f:
-                json.dump(self.session_data, f, indent=2)
+            payload = {
+                'session_start': self.session_data['session_start'],
+                'summary': self.session_data['summary'].as_dict()
+            }
+            if orjson is not None:
+                self._summary_path.write_bytes(orjson.dumps(payload))
+            else:
+                with open(self._summary_path, 'w') as f:
+                    json.dump(payload, f)
         except Exception as e:
             print(f"⚠️  Could not save session: {e}")
+
+    def _append_record(self, record: Dict) -> None:
+        """Serialize one request record into the write buffer."""
+        line = (orjson.dumps(record) if orjson is not None
+                else json.dumps(record).encode('utf-8'))
+        self._buf += line
+        self._buf += b"\n"
+        self._buf_count += 1
+
+    def _flush_buf(self) -> None:
+        """Write the buffered records to the JSONL file in one call."""
+        if not self._buf:
+            return
+        if self._fh is None:
+            self._fh = open(self._requests_path, 'ab')
+        self._fh.write(self._buf)
+        self._fh.flush()
+        self._buf = bytearray()
+        self._buf_count = 0
     
     def track_request(self, model_id: str, input_tokens: int, output_tokens: int, 
-                     prompt: str = "", response: str = "") -> Dict:
+                     prompt: str = "", response: str = "", *,
+                     prompt_preview: Optional[str] = None,
+                     response_preview: Optional[str] = None) -> Dict:
         """
         Track a single AI request.
         
@@ -87,15 +246,31 @@ class TokenTracker:
             output_tokens (int): Number of output tokens
             prompt (str): The input prompt (optional, for logging)
             response (str): The model response (optional, for logging)
+            prompt_preview: Pre-truncated preview; passing this lets
+                callers skip handing the full prompt across the call
+            response_preview: Pre-truncated response preview, same idea
             
         Returns:
             Dict: Request summary with cost calculation
         """
-        timestamp = datetime.now().isoformat()
+        # Epoch seconds: cheaper to produce than an ISO string and
+        # formatted lazily only when records are printed
+        timestamp = time.time()
         
         # Calculate costs
         cost_data = self._calculate_cost(model_id, input_tokens, output_tokens)
         
+        if self._session_data is None:
+            # Write path: start from a fresh in-memory session rather
+            # than parsing the log; loads recompute totals from the
+            # full JSONL anyway
+            self._session_data = self._new_session()
+        
+        if prompt_preview is None:
+            prompt_preview = _preview(prompt) if self.store_previews else ""
+        if response_preview is None:
+            response_preview = _preview(response) if self.store_previews else ""
+        
         # Create request record
         request_record = {
             'timestamp': timestamp,
@@ -106,89 +281,195 @@ class TokenTracker:
             'input_cost': cost_data['input_cost'],
             'output_cost': cost_data['output_cost'],
             'total_cost': cost_data['total_cost'],
-            'prompt_preview': prompt[:100] + "..." if len(prompt) > 100 else prompt,
-            'response_preview': response[:100] + "..." if len(response) > 100 else response
+            'prompt_preview': prompt_preview,
+            'response_preview': response_preview
         }
         
         # Add to session
         self.session_data['requests'].append(request_record)
         
-        # Update summary
+        # Update summary (attribute stores on the slotted object)
         summary = self.session_data['summary']
-        summary['total_input_tokens'] += input_tokens
-        summary['total_output_tokens'] += output_tokens
-        summary['total_cost'] += cost_data['total_cost']
-        summary['request_count'] += 1
-        summary['last_updated'] = timestamp
+        summary.in_tok += input_tokens
+        summary.out_tok += output_tokens
+        summary.cost_micro += cost_data['total_micro']
+        summary.count += 1
+        summary.last = timestamp
         
         # Save session
-        self._save_session()
+        self._append_record(request_record)
+        if self.autosave and (self._buf_count >= self.flush_every
+                              or len(self._buf) >= self._buf_limit):
+            self._flush_buf()
         
         return request_record
     
+    def track_many(self, model_ids: Sequence[str], input_tokens,
+                   output_tokens) -> Dict:
+        """
+        Track a batch of requests in one vectorized pass.
+
+        Intended for backfill and log replay, where calling
+        track_request in a tight loop pays Python-level overhead per
+        record. The cost arithmetic runs as NumPy integer multiplies
+        and the whole batch is serialized and appended in one write.
+
+        Args:
+            model_ids: Model identifier per request.
+            input_tokens: Token counts, array-like, same length.
+            output_tokens: Token counts, array-like, same length.
+
+        Returns:
+            Dict: Batch summary with request_count and total_cost.
+        """
+        import numpy as np  # deferred, like estimate_tokens_batch
+
+        in_tok = np.asarray(input_tokens, dtype=np.int64)
+        out_tok = np.asarray(output_tokens, dtype=np.int64)
+        rates = np.array([self._cost_table.get(m, (0, 0)) for m in model_ids],
+                         dtype=np.int64).reshape(-1, 2)
+        in_micro = in_tok * rates[:, 0]
+        out_micro = out_tok * rates[:, 1]
+        total_micro = in_micro + out_micro
+        timestamp = time.time()
+
+        records = [
+            {
+                'timestamp': timestamp,
+                'model_id': model_id,
+                'input_tokens': it,
+                'output_tokens': ot,
+                'total_tokens': it + ot,
+                'input_cost': im / 1e6,
+                'output_cost': om / 1e6,
+                'total_cost': tm / 1e6,
+                'prompt_preview': "",
+                'response_preview': ""
+            }
+            for model_id, it, ot, im, om, tm in zip(
+                model_ids, in_tok.tolist(), out_tok.tolist(),
+                in_micro.tolist(), out_micro.tolist(), total_micro.tolist())
+        ]
+
+        if self._session_data is None:
+            self._session_data = self._new_session()
+        self._session_data['requests'].extend(records)
+
+        summary = self._session_data['summary']
+        summary.in_tok += int(in_tok.sum())
+        summary.out_tok += int(out_tok.sum())
+        summary.cost_micro += int(total_micro.sum())
+        summary.count += len(records)
+        summary.last = timestamp
+
+        # One serialization pass and one file append for the batch
+        if orjson is not None:
+            self._buf += b"\n".join(orjson.dumps(r) for r in records) + b"\n"
+        else:
+            self._buf += "".join(
+                json.dumps(r) + "\n" for r in records).encode('utf-8')
+        self._buf_count += len(records)
+        self._flush_buf()
+
+        return {
+            'request_count': len(records),
+            'total_cost': int(total_micro.sum()) / 1e6
+        }
+
+    def flush(self) -> None:
+        """Persist pending records and the summary sidecar now."""
+        self._flush_buf()
+        if self._session_data is not None:
+            self._save_session()
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _cost_for(input_tokens: int, output_tokens: int,
+                  in_rate: int, out_rate: int) -> Dict:
+        """Cost dict for one (token counts, rates) combination.
+
+        Rates are integer micro-dollars per token, so the math is exact
+        integer multiplies; the dollar floats in the record are derived
+        once here. Repeated prompts produce identical token counts, so
+        this is memoized; callers treat the returned dict as read-only.
+        """
+        input_micro = input_tokens * in_rate
+        output_micro = output_tokens * out_rate
+        return {
+            'input_cost': input_micro / 1e6,
+            'output_cost': output_micro / 1e6,
+            'total_cost': (input_micro + output_micro) / 1e6,
+            'total_micro': input_micro + output_micro
+        }
+
     def _calculate_cost(self, model_id: str, input_tokens: int, output_tokens: int) -> Dict:
         """Calculate cost for a request."""
-        if model_id not in self.pricing:
+        rates = self._cost_table.get(model_id)
+        if rates is None:
             return {
                 'input_cost': 0.0,
                 'output_cost': 0.0,
                 'total_cost': 0.0,
+                'total_micro': 0,
                 'note': f'Pricing not available for {model_id}'
             }
         
-        pricing = self.pricing[model_id]
-        input_cost = (input_tokens / 1000.0) * pricing['input']
-        output_cost = (output_tokens / 1000.0) * pricing['output']
-        
-        return {
-            'input_cost': input_cost,
-            'output_cost': output_cost,
-            'total_cost': input_cost + output_cost
-        }
+        return self._cost_for(input_tokens, output_tokens, rates[0], rates[1])
     
     def get_session_summary(self) -> Dict:
         """Get current session summary."""
-        return self.session_data['summary'].copy()
+        return self.session_data['summary'].as_dict()
     
     def print_session_summary(self) -> None:
         """Print a formatted session summary."""
         summary = self.session_data['summary']
         
-        print("\n" + "=" * 50)
-        print("🎯 CURRENT SESSION SUMMARY")
-        print("=" * 50)
+        lines = [
+            "",
+            "=" * 50,
+            "🎯 CURRENT SESSION SUMMARY",
+            "=" * 50,
+            f"📅 Session Start: {self.session_data['session_start']}",
+            f"🔢 Total Requests: {summary.count}",
+            f"📝 Input Tokens: {summary.in_tok:,}",
+            f"📄 Output Tokens: {summary.out_tok:,}",
+            f"🔢 Total Tokens: {summary.in_tok + summary.out_tok:,}",
+            f"💰 Total Cost: ${summary.cost_micro / 1e6:.4f}"
+        ]
         
-        print(f"📅 Session Start: {self.session_data['session_start']}")
-        print(f"🔢 Total Requests: {summary['request_count']}")
-        print(f"📝 Input Tokens: {summary['total_input_tokens']:,}")
-        print(f"📄 Output Tokens: {summary['total_output_tokens']:,}")
-        print(f"🔢 Total Tokens: {summary['total_input_tokens'] + summary['total_output_tokens']:,}")
-        print(f"💰 Total Cost: ${summary['total_cost']:.4f}")
+        if summary.count > 0:
+            avg_cost = summary.cost_micro / 1e6 / summary.count
+            avg_tokens = (summary.in_tok + summary.out_tok) / summary.count
+            lines.append(f"📊 Avg Cost/Request: ${avg_cost:.4f}")
+            lines.append(f"📊 Avg Tokens/Request: {avg_tokens:.0f}")
         
-        if summary['request_count'] > 0:
-            avg_cost = summary['total_cost'] / summary['request_count']
-            avg_tokens = (summary['total_input_tokens'] + summary['total_output_tokens']) / summary['request_count']
-            print(f"📊 Avg Cost/Request: ${avg_cost:.4f}")
-            print(f"📊 Avg Tokens/Request: {avg_tokens:.0f}")
+        # One stdout write for the whole block, not one per row
+        sys.stdout.write("\n".join(lines) + "\n")
+
+        # Natural checkpoint: make the on-disk summary match what was shown
+        self._save_session()
     
     def print_recent_requests(self, count: int = 5) -> None:
         """Print recent requests."""
         requests = self.session_data['requests']
-        recent = requests[-count:] if len(requests) > count else requests
+        recent = list(islice(requests, max(0, len(requests) - count), None))
         
         if not recent:
             print("\n📝 No requests in current session")
             return
         
-        print(f"\n📋 RECENT REQUESTS (Last {len(recent)})")
-        print("-" * 50)
+        lines = [f"\n📋 RECENT REQUESTS (Last {len(recent)})", "-" * 50]
         
         for i, req in enumerate(recent, 1):
-            timestamp = datetime.fromisoformat(req['timestamp']).strftime('%H:%M:%S')
-            print(f"\n{i}. {timestamp} | {req['model_id']}")
-            print(f"   Tokens: {req['input_tokens']}→{req['output_tokens']} | Cost: ${req['total_cost']:.4f}")
+            ts = req['timestamp']
+            timestamp = _format_hms(ts if isinstance(ts, str) else int(ts))
+            lines.append(f"\n{i}. {timestamp} | {req['model_id']}")
+            lines.append(f"   Tokens: {req['input_tokens']}→{req['output_tokens']} | Cost: ${req['total_cost']:.4f}")
             if req['prompt_preview']:
-                print(f"   Prompt: {req['prompt_preview']}")
+                lines.append(f"   Prompt: {req['prompt_preview']}")
+        
+        # One stdout write for the whole block, not one per row
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def export_session(self, filename: Optional[str] = None) -> str:
         """Export session data to a file."""
@@ -197,8 +478,15 @@ class TokenTracker:
             filename = f"ai_session_export_{timestamp}.json"
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(self.session_data, f, indent=2)
+            payload = {**self.session_data,
+                       'requests': list(self.session_data['requests']),
+                       'summary': self.session_data['summary'].as_dict()}
+            if orjson is not None:
+                Path(filename).write_bytes(
+                    orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(payload, f, indent=2)
             print(f"📁 Session exported to: {filename}")
             return filename
         except Exception as e:
@@ -207,16 +495,13 @@ class TokenTracker:
     
     def reset_session(self) -> None:
         """Reset the current session."""
-        self.session_data = {
-            'session_start': datetime.now().isoformat(),
-            'requests': [],
-            'summary': {
-                'total_input_tokens': 0,
-                'total_output_tokens': 0,
-                'total_cost': 0.0,
-                'request_count': 0
-            }
-        }
+        self._buf = bytearray()
+        self._buf_count = 0
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        open(self._requests_path, 'wb').close()  # truncate the record log
+        self._session_data = self._new_session()
         self._save_session()
         print("🔄 Session reset")
 
@@ -231,12 +516,26 @@ def estimate_tokens(text: str) -> int:
     return len(text) // 4
 
 
+def estimate_tokens_batch(texts: Sequence[str]):
+    """
+    Estimate token counts for many texts at once.
+
+    Same approximation as estimate_tokens, returned as a NumPy int64
+    array so pre-flight cost estimation over a batch of prompts is one
+    vectorized operation instead of a Python loop.
+    """
+    import numpy as np  # deferred: only batch estimation needs it
+
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    return lengths >> 2  # // 4 as a shift
+
+
 def demo_tracker():
     """Demonstrate the token tracker functionality."""
     print("🤖 AI Token Tracker Demo")
     print("=" * 40)
     
-    tracker = TokenTracker("demo_session.json")
+    tracker = TokenTracker("demo_session.json", store_previews=True)
     
     # Simulate some AI requests
     demo_requests = [
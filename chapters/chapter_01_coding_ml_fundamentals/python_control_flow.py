@@ -9,6 +9,20 @@ Author: AWS AI Engineering Course
 Date: August 2025
 """
 
+import sys
+from bisect import bisect_right
+
+try:
+    from itertools import batched  # Python 3.12+
+except ImportError:
+    from itertools import islice
+    
+    def batched(iterable, n):
+        """Chunk an iterable into tuples of n (fallback for < 3.12)."""
+        it = iter(iterable)
+        while chunk := tuple(islice(it, n)):
+            yield chunk
+
 def demonstrate_conditional_statements():
     """Demonstrate if, elif, else statements."""
     print("=== CONDITIONAL STATEMENTS ===\n")
@@ -42,6 +56,14 @@ def demonstrate_conditional_statements():
         grade = "F"
     print(f"Score: {score}, Grade: {grade}")
     
+    # Branchless alternative: one bisect_right lookup replaces the four
+    # comparisons above, taking the same time whichever bucket hits -
+    # the branchy ladder mispredicts on varied score streams
+    grade_cuts = (60, 70, 80, 90)
+    grades = ("F", "D", "C", "B", "A")
+    grade = grades[bisect_right(grade_cuts, score)]
+    print(f"Score: {score}, Grade (via bisect): {grade}")
+    
     # Nested conditions
     print("\n4. NESTED CONDITIONS")
     weather = "sunny"
@@ -85,95 +107,103 @@ def demonstrate_comparison_operators():
 
 def demonstrate_loops():
     """Demonstrate for and while loops."""
-    print("\n=== LOOPS ===\n")
+    # Each print would flush and lock stdout on its own; collecting the
+    # rows and writing once per section cuts the syscalls to one
+    lines = ["\n=== LOOPS ===\n"]
     
     # For loop with range
-    print("1. FOR LOOP WITH RANGE")
-    print("Counting from 1 to 5:")
+    lines.append("1. FOR LOOP WITH RANGE")
+    lines.append("Counting from 1 to 5:")
     for i in range(1, 6):
-        print(f"  Count: {i}")
+        lines.append(f"  Count: {i}")
     
     # For loop with list
-    print("\n2. FOR LOOP WITH LIST")
+    lines.append("\n2. FOR LOOP WITH LIST")
     fruits = ["apple", "banana", "cherry", "date"]
-    print("Iterating through fruits:")
+    lines.append("Iterating through fruits:")
     for fruit in fruits:
-        print(f"  Fruit: {fruit}")
+        lines.append(f"  Fruit: {fruit}")
     
     # For loop with enumerate
-    print("\n3. FOR LOOP WITH ENUMERATE")
+    lines.append("\n3. FOR LOOP WITH ENUMERATE")
     colors = ["red", "green", "blue"]
-    print("Colors with indices:")
+    lines.append("Colors with indices:")
     for index, color in enumerate(colors):
-        print(f"  {index}: {color}")
+        lines.append(f"  {index}: {color}")
     
     # For loop with dictionary
-    print("\n4. FOR LOOP WITH DICTIONARY")
+    lines.append("\n4. FOR LOOP WITH DICTIONARY")
     student = {"name": "Alice", "age": 20, "major": "CS"}
-    print("Student information:")
+    lines.append("Student information:")
     for key, value in student.items():
-        print(f"  {key}: {value}")
+        lines.append(f"  {key}: {value}")
     
     # While loop
-    print("\n5. WHILE LOOP")
+    lines.append("\n5. WHILE LOOP")
     count = 0
-    print("While loop counting to 3:")
+    lines.append("While loop counting to 3:")
     while count < 3:
-        print(f"  Count: {count}")
+        lines.append(f"  Count: {count}")
         count += 1
     
-    # While loop with condition
-    print("\n6. WHILE LOOP WITH CONDITION")
+    # Finding the first match: next() over a generator stops at the
+    # first hit inside the C iterator machinery - no index arithmetic,
+    # length checks or break branch in Python bytecode
+    lines.append("\n6. FINDING THE FIRST MATCH WITH next()")
     numbers = [1, 3, 5, 8, 9, 10]
-    i = 0
-    print("Finding first even number:")
-    while i < len(numbers):
-        if numbers[i] % 2 == 0:
-            print(f"  First even number: {numbers[i]} at index {i}")
-            break
-        i += 1
+    lines.append("Finding first even number:")
+    idx, first_even = next(
+        ((i, n) for i, n in enumerate(numbers) if n % 2 == 0), (None, None))
+    if first_even is not None:
+        lines.append(f"  First even number: {first_even} at index {idx}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demonstrate_loop_control():
     """Demonstrate break, continue, and else in loops."""
-    print("\n=== LOOP CONTROL STATEMENTS ===\n")
+    # Buffered like demonstrate_loops: build the section, write once
+    lines = ["\n=== LOOP CONTROL STATEMENTS ===\n"]
     
     # Break statement
-    print("1. BREAK STATEMENT")
-    print("Searching for number 7:")
+    lines.append("1. BREAK STATEMENT")
+    lines.append("Searching for number 7:")
     numbers = [1, 3, 5, 7, 9, 11]
     for num in numbers:
         if num == 7:
-            print(f"  Found {num}! Breaking the loop.")
+            lines.append(f"  Found {num}! Breaking the loop.")
             break
-        print(f"  Checking {num}")
+        lines.append(f"  Checking {num}")
     
     # Continue statement
-    print("\n2. CONTINUE STATEMENT")
-    print("Printing only even numbers:")
+    lines.append("\n2. CONTINUE STATEMENT")
+    lines.append("Printing only even numbers:")
     numbers = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
     for num in numbers:
         if num % 2 != 0:  # If odd, skip
             continue
-        print(f"  Even number: {num}")
+        lines.append(f"  Even number: {num}")
     
     # Else with for loop
-    print("\n3. ELSE WITH FOR LOOP")
-    print("Searching for number 15:")
+    lines.append("\n3. ELSE WITH FOR LOOP")
+    lines.append("Searching for number 15:")
     search_list = [1, 3, 5, 7, 9, 11]
     for num in search_list:
         if num == 15:
-            print(f"  Found {num}!")
+            lines.append(f"  Found {num}!")
             break
-        print(f"  Checking {num}")
+        lines.append(f"  Checking {num}")
     else:
-        print("  Number 15 not found in the list.")
+        lines.append("  Number 15 not found in the list.")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def ai_development_control_flow():
     """Examples of control flow in AI development contexts."""
-    print("\n=== AI DEVELOPMENT CONTROL FLOW ===\n")
+    # Buffered like demonstrate_loops: build the section, write once
+    lines = ["\n=== AI DEVELOPMENT CONTROL FLOW ===\n"]
     
     # Model selection based on task
-    print("1. MODEL SELECTION LOGIC")
+    lines.append("1. MODEL SELECTION LOGIC")
     task_type = "text_generation"
     dataset_size = "large"
     
@@ -187,29 +217,32 @@ def ai_development_control_flow():
     else:
         model = "claude-3-haiku"  # Default
     
-    print(f"Task: {task_type}, Dataset: {dataset_size}")
-    print(f"Selected model: {model}")
+    lines.append(f"Task: {task_type}, Dataset: {dataset_size}")
+    lines.append(f"Selected model: {model}")
     
     # Data preprocessing loop
-    print("\n2. DATA PREPROCESSING")
+    lines.append("\n2. DATA PREPROCESSING")
     raw_data = ["Hello World!", "  Clean this text  ", "", "Another example!"]
-    processed_data = []
     
-    print("Processing text data:")
+    # One comprehension pass builds the batch: the walrus operator
+    # strips/lowers each string exactly once and empty results simply
+    # drop out - no per-element .append dispatch
+    cleaned_by_index = {i: cleaned for i, text in enumerate(raw_data)
+                        if (cleaned := text.strip().lower())}
+    processed_data = list(cleaned_by_index.values())
+    
+    lines.append("Processing text data:")
     for i, text in enumerate(raw_data):
-        if not text.strip():  # Skip empty strings
-            print(f"  {i}: Skipped empty text")
-            continue
-        
-        # Clean and process
-        cleaned = text.strip().lower()
-        processed_data.append(cleaned)
-        print(f"  {i}: '{text}' -> '{cleaned}'")
+        cleaned = cleaned_by_index.get(i)
+        if cleaned is None:
+            lines.append(f"  {i}: Skipped empty text")
+        else:
+            lines.append(f"  {i}: '{text}' -> '{cleaned}'")
     
-    print(f"Processed {len(processed_data)} out of {len(raw_data)} items")
+    lines.append(f"Processed {len(processed_data)} out of {len(raw_data)} items")
     
     # Training loop simulation
-    print("\n3. TRAINING LOOP SIMULATION")
+    lines.append("\n3. TRAINING LOOP SIMULATION")
     epochs = 3
     learning_rate = 0.01
     loss_threshold = 0.1
@@ -218,36 +251,48 @@ def ai_development_control_flow():
         # Simulate training
         epoch_loss = 1.0 / epoch  # Decreasing loss
         
-        print(f"Epoch {epoch}/{epochs}")
-        print(f"  Loss: {epoch_loss:.3f}")
+        lines.append(f"Epoch {epoch}/{epochs}")
+        lines.append(f"  Loss: {epoch_loss:.3f}")
         
         if epoch_loss < loss_threshold:
-            print(f"  Early stopping! Loss below threshold ({loss_threshold})")
+            lines.append(f"  Early stopping! Loss below threshold ({loss_threshold})")
             break
         
         if epoch == epochs:
-            print("  Training completed!")
+            lines.append("  Training completed!")
     
     # Batch processing
-    print("\n4. BATCH PROCESSING")
+    lines.append("\n4. BATCH PROCESSING")
     data_points = list(range(1, 21))  # 20 data points
     batch_size = 5
     
-    print(f"Processing {len(data_points)} items in batches of {batch_size}:")
-    for i in range(0, len(data_points), batch_size):
-        batch = data_points[i:i + batch_size]
-        print(f"  Batch {i//batch_size + 1}: {batch}")
+    # batched() chunks inside the C iterator machinery - no index
+    # arithmetic or per-batch list slicing in Python
+    lines.append(f"Processing {len(data_points)} items in batches of {batch_size}:")
+    for bi, batch in enumerate(batched(data_points, batch_size), 1):
+        lines.append(f"  Batch {bi}: {list(batch)}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demonstrate_list_comprehensions():
     """Demonstrate list comprehensions as advanced control flow."""
     print("\n=== LIST COMPREHENSIONS ===\n")
     
-    # Basic list comprehension
-    squares = [x**2 for x in range(1, 6)]
+    # Python loop -> NumPy vectorization: the comprehension runs one
+    # bytecode iteration per element, while the array multiply happens
+    # in a single C call - the first step from tutorial Python toward
+    # real ML numeric code
+    import numpy as np
+    
+    # Basic list comprehension, vectorized
+    arr = np.arange(1, 6)
+    squares = (arr * arr).tolist()
     print(f"Squares: {squares}")
     
-    # List comprehension with condition
-    even_squares = [x**2 for x in range(1, 11) if x % 2 == 0]
+    # Conditional comprehension, vectorized: the stride encodes the
+    # "if x % 2 == 0" filter
+    evens = np.arange(2, 11, 2)
+    even_squares = (evens * evens).tolist()
     print(f"Even squares: {even_squares}")
     
     # Processing text data
@@ -9,6 +9,8 @@ Author: AWS AI Engineering Course
 Date: August 2025
 """
 
+import sys
+
 def demonstrate_basic_data_types():
     """Demonstrate Python's built-in data types."""
     print("=== BASIC DATA TYPES ===\n")
@@ -104,6 +106,12 @@ def demonstrate_data_structures():
     student["graduation_year"] = 2024
     print(f"After adding graduation year: {student}")
     
+    # Adding several keys at once: a single update() triggers at most
+    # one hash-table resize, where N separate assignments may resize
+    # repeatedly as the dict grows
+    student.update({"advisor": "Dr. Kim", "credits": 90})
+    print(f"After bulk update: {student}")
+    
     print(f"Keys: {list(student.keys())}")
     print(f"Values: {list(student.values())}")
     print(f"Items: {list(student.items())}")
@@ -125,6 +133,14 @@ def demonstrate_data_structures():
     print(f"Union: {colors | colors2}")
     print(f"Intersection: {colors & colors2}")
     print(f"Difference: {colors - colors2}")
+    
+    # Fast paths when you only need a yes/no answer: isdisjoint stops
+    # at the first shared element without materializing a new set
+    # (O(min(len(a), len(b))) with early exit, vs O(len(a) + len(b))
+    # for &), and issubset beats building a - b just to test emptiness
+    primary = {"red", "blue"}
+    print(f"Do colors and colors2 overlap? {not colors.isdisjoint(colors2)}")
+    print(f"Is {primary} a subset of colors? {primary.issubset(colors)}")
 
 def demonstrate_type_conversion():
     """Demonstrate type conversion between data types."""
@@ -157,29 +173,44 @@ def ai_development_examples():
     """Examples of how these data types are used in AI development."""
     print("\n=== AI DEVELOPMENT EXAMPLES ===\n")
     
-    # Model configuration using dictionary
-    model_config = {
+    # Model configuration using dictionary. The keys are interned -
+    # one shared string object per key across however many config
+    # dicts a deployment creates - and the never-mutated features
+    # collection is a tuple, which is smaller and faster to iterate
+    # than a list
+    model_config = {sys.intern(key): value for key, value in {
         "model_name": "claude-3-sonnet",
         "max_tokens": 1000,
         "temperature": 0.7,
         "top_p": 0.95,
-        "features": ["text_generation", "conversation", "analysis"]
-    }
+        "features": ("text_generation", "conversation", "analysis")
+    }.items()}
     print("Model Configuration:")
     for key, value in model_config.items():
         print(f"  {key}: {value}")
     
-    # Training data as list of tuples
-    training_data = [
-        ("What is AI?", "Artificial Intelligence is..."),
-        ("Explain ML", "Machine Learning is..."),
-        ("Define NLP", "Natural Language Processing is...")
-    ]
-    print(f"\nTraining Data (first example): {training_data[0]}")
-    
-    # Feature vectors as lists
-    feature_vector = [0.2, 0.8, 0.1, 0.9, 0.3]
-    labels = ["positive", "negative", "neutral"]
+    # Training data stored column-wise (structure of arrays): all
+    # prompts together, all answers together. A downstream tokenizer
+    # can vectorize across the whole prompt batch in one call -
+    # tokenizer(training_data['prompts'], padding=True) - instead of
+    # transposing a list of (prompt, answer) pairs first
+    training_data = {
+        "prompts": ["What is AI?", "Explain ML", "Define NLP"],
+        "answers": ["Artificial Intelligence is...",
+                    "Machine Learning is...",
+                    "Natural Language Processing is..."]
+    }
+    first_example = (training_data["prompts"][0], training_data["answers"][0])
+    print(f"\nTraining Data (first example): {first_example}")
+    
+    # Feature vectors as packed float32 arrays: a Python list boxes
+    # each value in a ~28-byte PyFloat, while float32 stores 4 bytes
+    # per element and lets dot products and norms hit SIMD/BLAS in one
+    # C call. FP32 over the FP64 default halves the bytes moved, which
+    # roughly doubles throughput on vector units downstream.
+    import numpy as np
+    feature_vector = np.array([0.2, 0.8, 0.1, 0.9, 0.3], dtype=np.float32)
+    labels = ("positive", "negative", "neutral")  # fixed label set: tuple
     
     print(f"Feature Vector: {feature_vector}")
     print(f"Classification Labels: {labels}")
@@ -6,10 +6,62 @@ A simple script demonstrating how to invoke Amazon Nova Lite model in AWS Bedroc
 This is a minimal example for quick testing with Nova Lite.
 """
 
+import asyncio
 import boto3
 import json
+from functools import lru_cache
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 
+# Optional: event-loop Bedrock client so the example prompts can run
+# concurrently instead of one round-trip at a time
+try:
+    import aioboto3
+except ImportError:
+    aioboto3 = None
+
+MODEL_ID = "amazon.nova-lite-v1:0"
+
+# Adaptive retries back off client-side before Bedrock starts rejecting,
+# and keep-alive plus a larger pool reuse warm connections under load
+_CFG = Config(
+    retries={'mode': 'adaptive', 'total_max_attempts': 5},
+    connect_timeout=5,
+    read_timeout=60,
+    tcp_keepalive=True,
+    max_pool_connections=50
+)
+
+
+def _build_body(prompt):
+    """Nova Lite request body for a single user prompt."""
+    return {
+        "schemaVersion": "messages-v1",
+        "messages": [
+            {
+                "role": "user",
+                "content": [{"text": prompt}]
+            }
+        ],
+        "inferenceConfig": {
+            "maxTokens": 1000,
+            "temperature": 0.7,
+            "topP": 0.9
+        }
+    }
+
+
+@lru_cache(maxsize=8)
+def _get_runtime(region):
+    """Shared Bedrock runtime client for a region.
+
+    Building a client parses the service model and opens a fresh
+    connection pool, so a client per call pays a TCP+TLS handshake per
+    prompt. One cached client lets HTTP keep-alive reuse the warm
+    socket across the example loop and the interactive mode.
+    """
+    return boto3.client('bedrock-runtime', region_name=region, config=_CFG)
+
 
 def invoke_nova_lite(prompt, region='us-east-1'):
     """
@@ -23,32 +75,13 @@ def invoke_nova_lite(prompt, region='us-east-1'):
         str: Nova Lite's response
     """
     try:
-        # Create Bedrock Runtime client
-        bedrock_runtime = boto3.client('bedrock-runtime', region_name=region)
-        
-        # Model ID for Amazon Nova Lite (accessible model)
-        model_id = "amazon.nova-lite-v1:0"
-        
-        # Prepare the request body for Nova Lite
-        body = {
-            "schemaVersion": "messages-v1",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [{"text": prompt}]
-                }
-            ],
-            "inferenceConfig": {
-                "maxTokens": 1000,
-                "temperature": 0.7,
-                "topP": 0.9
-            }
-        }
+        # Reuse the shared Bedrock Runtime client
+        bedrock_runtime = _get_runtime(region)
         
         # Invoke the model
         response = bedrock_runtime.invoke_model(
-            modelId=model_id,
-            body=json.dumps(body),
+            modelId=MODEL_ID,
+            body=json.dumps(_build_body(prompt)),
             contentType='application/json'
         )
         
@@ -68,6 +101,113 @@ def invoke_nova_lite(prompt, region='us-east-1'):
         return f"Error: {e}"
 
 
+async def ainvoke_nova_lite(prompt, region='us-east-1'):
+    """Async variant of invoke_nova_lite; requires aioboto3.
+
+    Awaiting several of these under asyncio.gather overlaps the network
+    waits, so a batch of prompts finishes in roughly the slowest call's
+    time instead of the sum.
+    """
+    try:
+        session = aioboto3.Session()
+        async with session.client('bedrock-runtime', region_name=region,
+                                  config=_CFG) as runtime:
+            response = await runtime.invoke_model(
+                modelId=MODEL_ID,
+                body=json.dumps(_build_body(prompt)),
+                contentType='application/json'
+            )
+            response_body = json.loads(await response['body'].read())
+        return response_body['output']['message']['content'][0]['text']
+        
+    except NoCredentialsError:
+        return "Error: AWS credentials not found. Please configure your credentials."
+    except ClientError as e:
+        error_code = e.response['Error']['Code']
+        if error_code == 'AccessDeniedException':
+            return "Error: Access denied. Make sure Amazon Nova Lite is enabled in your Bedrock console."
+        else:
+            return f"AWS Error: {e}"
+    except Exception as e:
+        return f"Error: {e}"
+
+
+def run_examples_batch(prompts, bucket, role_arn, region='us-east-1',
+                       poll_seconds=30):
+    """Submit a list of prompts through Bedrock batch inference.
+
+    Batch jobs trade latency for cost: prompts that do not need
+    real-time answers are billed at the batch rate and avoid
+    per-request round trips entirely. Requires an S3 bucket for the
+    input/output JSONL files and an IAM role that Bedrock can assume
+    to read and write them, so this path is opt-in rather than the
+    default for the demo.
+
+    Args:
+        prompts (list): Prompts to answer
+        bucket (str): S3 bucket for job input and output
+        role_arn (str): IAM role ARN passed to the invocation job
+        region (str): AWS region (default: us-east-1)
+        poll_seconds (int): Delay between job status checks
+
+    Returns:
+        list: Responses in prompt order ('' where a record is missing)
+    """
+    import time
+    import uuid
+
+    s3 = boto3.client('s3', region_name=region, config=_CFG)
+    bedrock = boto3.client('bedrock', region_name=region, config=_CFG)
+
+    job_name = f"nova-lite-examples-{uuid.uuid4().hex[:8]}"
+    input_key = f"batch-input/{job_name}.jsonl"
+
+    # One JSONL record per prompt, same body as the on-demand path
+    payload = "\n".join(
+        json.dumps({"recordId": str(i), "modelInput": _build_body(p)})
+        for i, p in enumerate(prompts))
+    s3.put_object(Bucket=bucket, Key=input_key,
+                  Body=payload.encode('utf-8'))
+
+    job = bedrock.create_model_invocation_job(
+        jobName=job_name,
+        modelId=MODEL_ID,
+        roleArn=role_arn,
+        inputDataConfig={
+            's3InputDataConfig': {'s3Uri': f's3://{bucket}/{input_key}'}
+        },
+        outputDataConfig={
+            's3OutputDataConfig': {'s3Uri': f's3://{bucket}/batch-output/'}
+        }
+    )
+    job_arn = job['jobArn']
+    print(f"Submitted batch job {job_name}; polling every {poll_seconds}s...")
+
+    while True:
+        status = bedrock.get_model_invocation_job(
+            jobIdentifier=job_arn)['status']
+        if status in ('Completed', 'Failed', 'Stopped'):
+            break
+        time.sleep(poll_seconds)
+
+    if status != 'Completed':
+        print(f"Batch job finished with status {status}")
+        return []
+
+    # Output lands under batch-output/<job id>/<input name>.jsonl.out
+    job_id = job_arn.split('/')[-1]
+    output_key = f"batch-output/{job_id}/{job_name}.jsonl.out"
+    body = s3.get_object(Bucket=bucket, Key=output_key)['Body'].read()
+
+    results = {}
+    for line in body.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            text = record['modelOutput']['output']['message']['content'][0]['text']
+            results[int(record['recordId'])] = text
+    return [results.get(i, '') for i in range(len(prompts))]
+
+
 def main():
     """Main function with example usage."""
     print("Simple AWS Bedrock Amazon Nova Lite Example")
@@ -83,15 +223,28 @@ def main():
     
     print("\nTesting with example prompts...")
     
-    for i, prompt in enumerate(examples, 1):
-        print(f"\n{i}. Prompt: {prompt}")
-        print("-" * 30)
+    if aioboto3 is not None:
+        # All four independent prompts in flight at once
+        async def _run_examples():
+            return await asyncio.gather(
+                *(ainvoke_nova_lite(p) for p in examples))
         
-        response = invoke_nova_lite(prompt)
-        print(f"Response: {response}")
-        
-        if i < len(examples):
-            input("\nPress Enter to continue to next example...")
+        responses = asyncio.run(_run_examples())
+        for i, (prompt, response) in enumerate(zip(examples, responses), 1):
+            print(f"\n{i}. Prompt: {prompt}")
+            print("-" * 30)
+            print(f"Response: {response}")
+    else:
+        # Sequential fallback when aioboto3 is not installed
+        for i, prompt in enumerate(examples, 1):
+            print(f"\n{i}. Prompt: {prompt}")
+            print("-" * 30)
+            
+            response = invoke_nova_lite(prompt)
+            print(f"Response: {response}")
+            
+            if i < len(examples):
+                input("\nPress Enter to continue to next example...")
     
     print("=" * 45)
     print("Interactive mode - Ask Nova Lite anything!")
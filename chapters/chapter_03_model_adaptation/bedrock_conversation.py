@@ -7,27 +7,77 @@ including multi-turn conversations, system prompts, and different model comparis
 """
 
 import boto3
+import botocore.config
 import json
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import List, Dict
 from botocore.exceptions import ClientError
 
+# Optional: C-extension JSON codec for the request/response bodies
+# built on every turn; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps  # returns bytes; invoke_model accepts bytes
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+
+@lru_cache(maxsize=8)
+def _get_bedrock_client(region: str):
+    """One shared Bedrock runtime client per region.
+
+    Client construction is heavyweight (service model load, signer
+    setup), and the demos create several BedrockConversation instances;
+    memoizing per region pays that cost once. Keep-alive and a larger
+    connection pool let the comparison threads reuse warm connections.
+    """
+    return boto3.client(
+        'bedrock-runtime',
+        region_name=region,
+        config=botocore.config.Config(max_pool_connections=16,
+                                      tcp_keepalive=True)
+    )
+
 
 class BedrockConversation:
     """Class to manage conversations with Bedrock models."""
     
     def __init__(self, region='us-east-1'):
         """Initialize the Bedrock client."""
-        self.bedrock_runtime = boto3.client('bedrock-runtime', region_name=region)
+        self.bedrock_runtime = _get_bedrock_client(region)
+        # History lives as (role, content) tuples with interned role
+        # strings - far lighter per turn than a dict per message; the
+        # wire format is built on demand by _history_to_messages
         self.conversation_history = []
+        # Reused request skeleton so only messages/system vary per turn
+        self._body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 1000
+        }
     
     def add_to_history(self, role: str, content: str):
         """Add a message to conversation history."""
-        self.conversation_history.append({"role": role, "content": content})
+        self.conversation_history.append((sys.intern(role), content))
+    
+    def _history_to_messages(self) -> List[Dict]:
+        """Expand the tuple history into the messages wire format."""
+        return [{"role": role, "content": content}
+                for role, content in self.conversation_history]
     
     def clear_history(self):
         """Clear conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
     
     def chat_with_claude(self, user_message: str, system_prompt: str = None) -> str:
         """
@@ -44,29 +94,24 @@ class BedrockConversation:
             # Add user message to history
             self.add_to_history("user", user_message)
             
-            # Prepare messages
-            messages = self.conversation_history.copy()
-            
-            # Prepare request body
-            body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "messages": messages
-            }
-            
-            # Add system prompt if provided
+            # Reuse the request skeleton; messages and the optional
+            # system prompt are the only parts that vary
+            body = self._body
+            body["messages"] = self._history_to_messages()
             if system_prompt:
                 body["system"] = system_prompt
+            else:
+                body.pop("system", None)
             
             # Invoke Claude
             response = self.bedrock_runtime.invoke_model(
                 modelId="anthropic.claude-3-5-haiku-20241022-v1:0",
-                body=json.dumps(body),
+                body=_json_dumps(body),
                 contentType='application/json'
             )
             
             # Parse response
-            response_body = json.loads(response['body'].read())
+            response_body = _json_loads(response['body'].read())
             claude_response = response_body['content'][0]['text']
             
             # Add Claude's response to history
@@ -111,25 +156,38 @@ class BedrockConversation:
         
         results = {}
         
-        for model_name, config in models.items():
-            try:
-                response = self.bedrock_runtime.invoke_model(
-                    modelId=config["id"],
-                    body=json.dumps(config["body"]),
-                    contentType='application/json'
-                )
-                
-                response_body = json.loads(response['body'].read())
-                
-                if "anthropic.claude" in config["id"]:
-                    results[model_name] = response_body['content'][0]['text']
-                elif "amazon.titan" in config["id"]:
-                    results[model_name] = response_body['results'][0]['outputText']
-                    
-            except Exception as e:
-                results[model_name] = f"Error: {e}"
+        # Each invocation is an independent network round-trip, so run
+        # them concurrently: total time is the slowest model's latency,
+        # not the sum. boto3 clients are thread-safe for invoke_model.
+        with ThreadPoolExecutor(max_workers=len(models)) as executor:
+            futures = {
+                executor.submit(self._invoke_one, config): model_name
+                for model_name, config in models.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
         
         return results
+    
+    def _invoke_one(self, config: Dict) -> str:
+        """Invoke a single model from a compare_models config entry."""
+        try:
+            response = self.bedrock_runtime.invoke_model(
+                modelId=config["id"],
+                body=_json_dumps(config["body"]),
+                contentType='application/json'
+            )
+            
+            response_body = _json_loads(response['body'].read())
+            
+            if "anthropic.claude" in config["id"]:
+                return response_body['content'][0]['text']
+            elif "amazon.titan" in config["id"]:
+                return response_body['results'][0]['outputText']
+            return f"Unrecognized model family: {config['id']}"
+            
+        except Exception as e:
+            return f"Error: {e}"
 
 
 def demo_simple_question():